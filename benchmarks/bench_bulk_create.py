@@ -0,0 +1,50 @@
+"""
+Compares creating orders one by one through create_order with a single create_orders_bulk call.
+
+Usage: python -m benchmarks.bench_bulk_create [--orders 2000] [--items 3]
+Needs the docker-compose MySQL server, see benchmarks/db.py.
+"""
+import argparse
+import json
+import time
+
+from .db import get_engine, seed_orders, use_bench_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", type=int, default=2000)
+    parser.add_argument("--items", type=int, default=3, help="order items per order in the bulk request")
+    args = parser.parse_args()
+
+    seed_orders(get_engine(), 0)
+    with use_bench_database():
+        from exampleco.api.orders import create_order, create_orders_bulk  # pylint: disable=import-outside-toplevel
+
+        orders = [
+            {
+                "name": f"Order {i}",
+                "service_id": i % 10 + 1,
+                "order_items": [{"name": f"Item {j}"} for j in range(args.items)],
+            }
+            for i in range(args.orders)
+        ]
+
+        start = time.perf_counter()
+        for order in orders:
+            body = {"name": order["name"], "service_id": order["service_id"]}
+            assert create_order({"body": json.dumps(body)}, None)["statusCode"] == 201
+        single = time.perf_counter() - start
+
+        start = time.perf_counter()
+        assert create_orders_bulk({"body": json.dumps({"orders": orders})}, None)["statusCode"] == 201
+        bulk = time.perf_counter() - start
+
+    print(f"{args.orders} orders")
+    print(f"{'create_order loop (no items)':<36} {args.orders / single:10.0f} orders/s")
+    print(f"{f'create_orders_bulk ({args.items} items each)':<36} {args.orders / bulk:10.0f} orders/s")
+    print(f"{'speedup':<36} {single / bulk:10.1f} x")
+
+
+if __name__ == "__main__":
+    main()
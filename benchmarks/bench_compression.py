@@ -0,0 +1,47 @@
+"""
+CPU time vs. response size of gzip and brotli (if installed) on order detail lists of several sizes.
+Sizes are of the base64 encoded body, which is what the Lambda proxy response carries.
+
+Usage: python -m benchmarks.bench_compression [--sizes 1,10,100,1000,10000] [--repeat 5]
+"""
+import argparse
+import base64
+import gzip
+import json
+import timeit
+
+from exampleco.models.database.serializers import dump_order_detail
+from exampleco.utils.compression import brotli
+
+from .bench_serializers import make_orders
+
+
+def codecs():
+    yield "identity", lambda data: data
+    for level in (1, 6, 9):
+        yield f"gzip -{level}", lambda data, level=level: gzip.compress(data, compresslevel=level, mtime=0)
+    if brotli is not None:
+        for quality in (1, 5, 11):
+            yield f"br q{quality}", lambda data, quality=quality: brotli.compress(data, quality=quality)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1,10,100,1000,10000", help="comma separated numbers of orders")
+    parser.add_argument("--items", type=int, default=3, help="order items per order")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if brotli is None:
+        print("brotli is not installed, only gzip is measured")
+    print(f"{'orders':>8} {'codec':<10} {'json bytes':>12} {'sent bytes':>12} {'ratio':>7} {'ms':>9}")
+    for size in (int(size) for size in args.sizes.split(",")):
+        body = json.dumps([dump_order_detail(order) for order in make_orders(size, args.items)]).encode()
+        for name, compress in codecs():
+            best = min(timeit.repeat(lambda: compress(body), number=1, repeat=args.repeat))
+            sent = len(body) if name == "identity" else len(base64.b64encode(compress(body)))
+            print(f"{size:>8} {name:<10} {len(body):>12} {sent:>12} {sent / len(body):>7.3f} {best * 1000:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Measures cold start import cost of every handler declared in serverless.yml.
+Each handler module is imported in a fresh interpreter with -X importtime, run from the repo root like Lambda does.
+
+Usage: python -m benchmarks.bench_importtime [--repeat 5] [--top 10]
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+from .serverless import ROOT, load_functions, split_handler
+
+
+def parse_importtime(stderr):
+    """
+    Returns:
+        Returns list of (cumulative microseconds, nesting depth, module) of every imported module.
+    """
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, module = line[len("import time:") :].split("|")
+        depth = (len(module) - len(module.lstrip()) - 1) // 2
+        imports.append((int(cumulative), depth, module.strip()))
+    return imports
+
+
+def measure(module, repeat):
+    """
+    Returns:
+        Returns median cumulative import time of module and imports it triggered directly in the last run.
+    """
+    totals = []
+    children = []
+    for _ in range(repeat):
+        process = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        imports = parse_importtime(process.stderr)
+        # children are reported before their parent
+        position = next(i for i, (_, depth, name) in enumerate(imports) if depth == 0 and name == module)
+        totals.append(imports[position][0])
+        start = max((i for i in range(position) if imports[i][1] == 0), default=-1) + 1
+        children = [(cumulative, name) for cumulative, depth, name in imports[start:position] if depth == 1]
+    return statistics.median(totals), children
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=0, help="also print the heaviest imports of each handler")
+    args = parser.parse_args()
+
+    modules = {}
+    for function in load_functions():
+        module, _ = split_handler(function["handler"])
+        modules.setdefault(module, []).append(function["name"])
+
+    print(f"median of {args.repeat} fresh interpreters")
+    for module, names in modules.items():
+        total, children = measure(module, args.repeat)
+        print(f"{total / 1000:8.1f} ms  {module} ({', '.join(names)})")
+        for cumulative, name in sorted(children, reverse=True)[: args.top]:
+            print(f"{'':12}{cumulative / 1000:8.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
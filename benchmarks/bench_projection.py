@@ -0,0 +1,63 @@
+"""
+Compares time and memory of listing orders as ORM instances and as column-only rows.
+
+Usage: python -m benchmarks.bench_projection [--rows 100000] [--repeat 3]
+Needs the docker-compose MySQL server, see benchmarks/db.py.
+"""
+import argparse
+import timeit
+import tracemalloc
+
+from sqlalchemy.orm import sessionmaker
+
+from exampleco.models.database.orders import Order
+from exampleco.models.database.serializers import ORDER_LIST_FIELDS, dump_order, projection
+
+from .db import get_engine, seed_orders
+
+
+def measure(label, func, repeat):
+    best = min(timeit.repeat(func, number=1, repeat=repeat))
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<20} {best * 1000:10.1f} ms {peak / 2 ** 20:10.1f} MiB peak")
+    return best, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    engine = get_engine()
+    seed_orders(engine, args.rows)
+    session_maker = sessionmaker(bind=engine)
+    columns = projection(Order, ORDER_LIST_FIELDS)
+
+    def orm():
+        session = session_maker()
+        try:
+            return [dump_order(order) for order in session.query(Order).filter(Order.is_active)]
+        finally:
+            session.close()
+
+    def rows():
+        session = session_maker()
+        try:
+            return [dump_order(row) for row in session.query(*columns).filter(Order.is_active)]
+        finally:
+            session.close()
+
+    if orm() != rows():
+        raise SystemExit("projection output differs from ORM output")
+    print(f"{args.rows} orders, best of {args.repeat}")
+    orm_time, orm_peak = measure("ORM instances", orm, args.repeat)
+    rows_time, rows_peak = measure("column rows", rows, args.repeat)
+    print(f"{'speedup':<20} {orm_time / rows_time:10.1f} x {orm_peak / rows_peak:10.1f} x less memory")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Compares marshmallow schemas with the precompiled serializers on large order lists.
+
+Usage: python -m benchmarks.bench_serializers [--rows 10000] [--repeat 5]
+"""
+import argparse
+import datetime
+import json
+import timeit
+
+from exampleco.models.database.orders import Order, OrderItem
+from exampleco.models.database.schemas import OrderSchemaDetail, OrderSchemaList
+from exampleco.models.database.serializers import dump_order, dump_order_detail
+
+
+def make_orders(rows, items_per_order):
+    created_on = datetime.datetime(2022, 1, 1)
+    orders = []
+    for pk in range(1, rows + 1):
+        dtm = created_on + datetime.timedelta(minutes=pk)
+        order = Order(id=pk, name=f"Order {pk}", service_id=pk % 10 + 1, created_on=dtm, modified_on=dtm)
+        order.order_items = [
+            OrderItem(id=pk * 10 + i, name=f"Item {i}", order_id=pk, created_on=dtm, modified_on=dtm)
+            for i in range(items_per_order)
+        ]
+        orders.append(order)
+    return orders
+
+
+def bench(label, func, repeat):
+    best = min(timeit.repeat(func, number=1, repeat=repeat))
+    print(f"{label:<40} {best * 1000:10.1f} ms")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--items", type=int, default=3, help="order items per order in the detail benchmark")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    orders = make_orders(args.rows, args.items)
+    cases = [
+        ("list", lambda: OrderSchemaList(many=True).dump(orders), lambda: [dump_order(o) for o in orders]),
+        (
+            "detail",
+            lambda: OrderSchemaDetail(many=True).dump(orders),
+            lambda: [dump_order_detail(o) for o in orders],
+        ),
+    ]
+    print(f"{args.rows} orders, {args.items} items per order, best of {args.repeat}")
+    for name, marshmallow_dump, fast_dump in cases:
+        if json.dumps(marshmallow_dump()) != json.dumps(fast_dump()):
+            raise SystemExit(f"{name}: serializers output differs from marshmallow")
+        slow = bench(f"{name} marshmallow", marshmallow_dump, args.repeat)
+        fast = bench(f"{name} precompiled", fast_dump, args.repeat)
+        print(f"{name + ' speedup':<40} {slow / fast:10.1f} x")
+
+
+if __name__ == "__main__":
+    main()
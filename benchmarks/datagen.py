@@ -0,0 +1,253 @@
+"""
+Synthetic data generator for services, orders and order items.
+
+Rows are generated in chunks with explicit ids, so items reference their orders without reading anything back,
+and loaded with LOAD DATA LOCAL INFILE (default) or multi-row INSERTs. created_on follows a configurable
+distribution over the last --days days and grows with the order id like real data, the hourly stats rollup
+is rebuilt at the end. Existing rows of the three tables and the rollup are replaced.
+
+Usage: python -m benchmarks.datagen [--orders 2000000] [--items 4] [--services 50] [--days 365]
+       [--distribution uniform|recent|diurnal] [--deleted 0.05] [--method load-data|insert]
+       [--chunk-size 50000] [--url URL] [--seed 0]
+Needs the docker-compose MySQL server (local_infile is enabled by default on MySQL 5.7), see benchmarks/db.py.
+"""
+import argparse
+import bisect
+import datetime
+import math
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy.orm import Session
+
+from exampleco.models.database.stats import rebuild_hourly_stats
+
+from .db import BENCH_DB_URL, get_engine
+
+# relative order volume per hour of the day, busiest in the afternoon and evening
+HOURLY_WEIGHTS = (2, 1, 1, 1, 1, 2, 4, 6, 8, 9, 10, 11, 12, 12, 12, 12, 12, 13, 14, 14, 12, 9, 6, 4)
+WEEKEND_WEIGHT = 0.6
+# growth rate of the "recent" distribution, the last day of the span gets e**RECENT_GROWTH times the first
+RECENT_GROWTH = 3.0
+
+
+def _uniform(bucket, position):  # pylint: disable=unused-argument
+    return 1.0
+
+
+def _recent(bucket, position):  # pylint: disable=unused-argument
+    return math.exp(RECENT_GROWTH * position)
+
+
+def _diurnal(bucket, position):  # pylint: disable=unused-argument
+    return HOURLY_WEIGHTS[bucket.hour] * (WEEKEND_WEIGHT if bucket.weekday() >= 5 else 1.0)
+
+
+# name -> weight of an hourly bucket given its start and its position (0..1) in the span
+DISTRIBUTIONS = {"uniform": _uniform, "recent": _recent, "diurnal": _diurnal}
+
+ORDER_COLUMNS = ("id", "name", "service_id", "status", "total", "created_on", "modified_on")
+ITEM_COLUMNS = ("id", "name", "order_id", "service_id", "price", "created_on", "modified_on")
+SERVICE_COLUMNS = ("id", "name", "description", "price")
+
+
+class TimeDistribution:
+    """Inverse CDF of a piecewise constant density over hourly buckets between start and end."""
+
+    def __init__(self, start, end, weight):
+        self.start = start.replace(minute=0, second=0, microsecond=0)
+        hours = max(1, math.ceil((end - self.start).total_seconds() / 3600))
+        self.cumulative = []
+        total = 0.0
+        for hour in range(hours):
+            total += weight(self.start + datetime.timedelta(hours=hour), hour / hours)
+            self.cumulative.append(total)
+
+    def at(self, quantile):
+        """
+        Returns:
+            Returns the datetime below which the given share of rows is created.
+        """
+        target = quantile * self.cumulative[-1]
+        hour = min(bisect.bisect_right(self.cumulative, target), len(self.cumulative) - 1)
+        previous = self.cumulative[hour - 1] if hour else 0.0
+        fraction = (target - previous) / (self.cumulative[hour] - previous)
+        return self.start + datetime.timedelta(hours=hour + fraction)
+
+
+def created_on_chunk(distribution, first, last, total, rng):
+    """
+    Samples creation times of rows first..last (1-based, inclusive) of total from their share of the distribution.
+
+    Returns:
+        Returns ascending list of datetimes truncated to seconds, so times grow with ids across chunks too.
+    """
+    low, high = (first - 1) / total, last / total
+    quantiles = sorted(low + rng.random() * (high - low) for _ in range(last - first + 1))
+    return [distribution.at(quantile).replace(microsecond=0) for quantile in quantiles]
+
+
+def generate_chunk(first, last, created_on, prices, items, deleted, end, rng, next_item_id):
+    """
+    prices lists the price of every service, service i + 1 costs prices[i]. Items mostly belong to the service
+    of their order and snapshot its price, order totals are the sum of item prices.
+
+    Returns:
+        Returns (order rows, item rows) as tuples in ORDER_COLUMNS and ITEM_COLUMNS order.
+    """
+    orders = []
+    order_items = []
+    for order_id, created in zip(range(first, last + 1), created_on):
+        status = "DELETED" if rng.random() < deleted else "ACTIVE"
+        modified = created + (end - created) * rng.random() if status == "DELETED" else created
+        service_id = rng.randint(1, len(prices))
+        total = 0.0
+        for position in range(rng.randint(0, 2 * items)):
+            item_service_id = service_id if rng.random() < 0.8 else rng.randint(1, len(prices))
+            price = prices[item_service_id - 1]
+            order_items.append((next_item_id, f"Item {position}", order_id, item_service_id, price, created, created))
+            total += price
+            next_item_id += 1
+        orders.append((order_id, f"Order {order_id}", service_id, status, round(total, 2), created, modified))
+    return orders, order_items
+
+
+def _format(value):
+    if isinstance(value, datetime.datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    if value is None:
+        return "\\N"
+    return str(value)
+
+
+def load_data(cursor, table, columns, rows):
+    """Loads rows through a temporary tab separated file with LOAD DATA LOCAL INFILE."""
+    with tempfile.NamedTemporaryFile("w", suffix=".tsv", delete=False) as file:
+        for row in rows:
+            file.write("\t".join(_format(value) for value in row) + "\n")
+    try:
+        cursor.execute(
+            f"LOAD DATA LOCAL INFILE %s INTO TABLE {table} "
+            f"FIELDS TERMINATED BY '\\t' LINES TERMINATED BY '\\n' ({', '.join(columns)})",
+            (file.name,),
+        )
+    finally:
+        os.unlink(file.name)
+
+
+def insert_rows(cursor, table, columns, rows):
+    """PyMySQL turns executemany of an INSERT ... VALUES into multi-row INSERTs of up to 1 MB each."""
+    placeholders = ", ".join(["%s"] * len(columns))
+    cursor.executemany(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})", rows)
+
+
+LOADERS = {"load-data": load_data, "insert": insert_rows}
+
+
+def generate(
+    engine,
+    orders,
+    items=4,
+    services=50,
+    days=365,
+    distribution="diurnal",
+    deleted=0.05,
+    method="load-data",
+    chunk_size=50000,
+    rng=None,
+    log=None,
+):
+    """
+    Replaces services, orders and order items with generated rows and rebuilds the hourly stats.
+    method is a LOADERS key, rng defaults to random.Random(0), log is called with a progress message per chunk.
+
+    Returns:
+        Returns dict with number of loaded rows per table and seconds spent.
+    """
+    load = LOADERS[method]
+    rng = rng or random.Random(0)
+    log = log or (lambda message: None)
+    end = datetime.datetime.now()
+    times = TimeDistribution(end - datetime.timedelta(days=days), end, DISTRIBUTIONS[distribution])
+    counts = {"services": services, "orders": orders, "order_items": 0}
+    start = time.perf_counter()
+
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.execute("SET foreign_key_checks = 0, unique_checks = 0")
+        for table in ("order_stats_hourly", "order_items", "orders", "services"):
+            cursor.execute(f"TRUNCATE TABLE {table}")
+        service_rows = [
+            (pk, f"Service {pk}", f"Generated service {pk}", round(rng.uniform(5, 500), 2))
+            for pk in range(1, services + 1)
+        ]
+        load(cursor, "services", SERVICE_COLUMNS, service_rows)
+        next_item_id = 1
+        for first in range(1, orders + 1, chunk_size):
+            last = min(first + chunk_size - 1, orders)
+            created_on = created_on_chunk(times, first, last, orders, rng)
+            order_rows, item_rows = generate_chunk(
+                first, last, created_on, [row[3] for row in service_rows], items, deleted, end, rng, next_item_id
+            )
+            load(cursor, "orders", ORDER_COLUMNS, order_rows)
+            if item_rows:
+                load(cursor, "order_items", ITEM_COLUMNS, item_rows)
+            next_item_id += len(item_rows)
+            counts["order_items"] += len(item_rows)
+            connection.commit()
+            rows = last + counts["order_items"]
+            log(f"{last} orders, {counts['order_items']} items, {rows / (time.perf_counter() - start):.0f} rows/s")
+        cursor.execute("SET foreign_key_checks = 1, unique_checks = 1")
+    finally:
+        connection.close()
+
+    session = Session(bind=engine)
+    try:
+        rebuild_hourly_stats(session, end - datetime.timedelta(days=days + 1))
+        session.commit()
+    finally:
+        session.close()
+    counts["seconds"] = round(time.perf_counter() - start, 1)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", type=int, default=2000000)
+    parser.add_argument("--items", type=int, default=4, help="average order items per order (0 to 2x)")
+    parser.add_argument("--services", type=int, default=50)
+    parser.add_argument("--days", type=int, default=365, help="span of created_on ending now")
+    parser.add_argument("--distribution", choices=sorted(DISTRIBUTIONS), default="diurnal")
+    parser.add_argument("--deleted", type=float, default=0.05, help="share of soft deleted orders")
+    parser.add_argument("--method", choices=sorted(LOADERS), default="load-data")
+    parser.add_argument("--chunk-size", type=int, default=50000, help="orders generated and loaded at once")
+    parser.add_argument("--url", default=BENCH_DB_URL, help="database to load, the benchmark database by default")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    engine = get_engine(args.url, connect_args={"local_infile": True})
+    counts = generate(
+        engine,
+        args.orders,
+        args.items,
+        args.services,
+        args.days,
+        args.distribution,
+        args.deleted,
+        method=args.method,
+        chunk_size=args.chunk_size,
+        rng=random.Random(args.seed),
+        log=print,
+    )
+    rows = counts["services"] + counts["orders"] + counts["order_items"]
+    print(
+        f"loaded {counts['services']} services, {counts['orders']} orders, {counts['order_items']} items "
+        f"in {counts['seconds']} s ({rows / max(counts['seconds'], 0.001):.0f} rows/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark database helpers. Uses a separate database on the docker-compose MySQL server.
+"""
+import datetime
+import os
+from unittest.mock import patch
+
+from sqlalchemy import create_engine
+from sqlalchemy_utils import create_database, database_exists
+
+from exampleco.models.database import Base
+from exampleco.models.database.orders import Order, OrderItem
+from exampleco.models.database.services import Service
+from exampleco.models.database.stats import OrderStatsHourly  # pylint: disable=unused-import
+
+BENCH_DB_CONFIG = {
+    "DB_USER": os.environ.get("BENCH_DB_USER", "root"),
+    "DB_PASSWORD": os.environ.get("BENCH_DB_PASSWORD", "rootpassword"),
+    "DB_HOST": os.environ.get("BENCH_DB_HOST", "localhost"),
+    "DB_NAME": os.environ.get("BENCH_DB_NAME", "db_bench"),
+}
+BENCH_DB_URL = "mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}".format(**BENCH_DB_CONFIG)
+INSERT_CHUNK_SIZE = 5000
+
+
+def use_bench_database():
+    """Points the handlers at the benchmark database, use as a context manager around handler calls."""
+    return patch("exampleco.models.database.get_db_config", return_value=BENCH_DB_CONFIG)
+
+
+def get_engine(url=BENCH_DB_URL, **options):
+    """Creates the benchmark database and its tables if missing, options are passed to create_engine."""
+    if not database_exists(url):
+        create_database(url)
+    engine = create_engine(url, isolation_level="READ COMMITTED", **options)
+    Base.metadata.create_all(engine)
+    return engine
+
+
+def seed_orders(engine, orders, items_per_order=0, services=10):
+    """Replaces benchmark data with given number of orders using multi-row inserts."""
+    with engine.begin() as connection:
+        for table in (OrderItem.__table__, Order.__table__, Service.__table__):
+            connection.execute(table.delete())
+        connection.execute(
+            Service.__table__.insert(),
+            [{"id": pk, "name": f"Service {pk}", "price": pk * 10.0} for pk in range(1, services + 1)],
+        )
+        created_on = datetime.datetime.now() - datetime.timedelta(days=365)
+        step = datetime.timedelta(days=365) / max(orders, 1)
+        for start in range(1, orders + 1, INSERT_CHUNK_SIZE):
+            pks = range(start, min(start + INSERT_CHUNK_SIZE, orders + 1))
+            connection.execute(
+                Order.__table__.insert(),
+                [
+                    {
+                        "id": pk,
+                        "name": f"Order {pk}",
+                        "service_id": pk % services + 1,
+                        "total": (pk % services + 1) * 10.0 * items_per_order,
+                        "created_on": created_on + step * pk,
+                    }
+                    for pk in pks
+                ],
+            )
+            if items_per_order:
+                connection.execute(
+                    OrderItem.__table__.insert(),
+                    [
+                        {
+                            "order_id": pk,
+                            "name": f"Item {i}",
+                            "service_id": pk % services + 1,
+                            "price": (pk % services + 1) * 10.0,
+                        }
+                        for pk in pks
+                        for i in range(items_per_order)
+                    ],
+                )
@@ -0,0 +1,265 @@
+"""
+Load test of every function declared in serverless.yml, invoked in-process and concurrently.
+
+Seeds the benchmark database with benchmarks/datagen.py, runs each function's requests on a thread pool and reports
+throughput and latency percentiles per function. With --mixed all requests are interleaved in one run instead.
+Results can be saved as a baseline, later runs exit with status 1 when p95 latency or throughput of any function
+regresses by more than --tolerance or when a function returns 5xx.
+The write scenarios delete, reactivate and create orders, so baselines are only saved and compared on freshly
+seeded data, --skip-seed cannot be combined with --baseline or --save-baseline.
+Threads share the GIL, so at high concurrency latencies include CPU contention a Lambda container
+(one invocation at a time) does not have, --concurrency 1 measures single invocation latency.
+
+Usage: python -m benchmarks.loadtest [--orders 1000000] [--items 5] [--skip-seed] [--requests 200]
+       [--concurrency 8] [--mixed] [--baseline PATH] [--save-baseline PATH] [--tolerance 0.2]
+Needs the docker-compose MySQL server, see benchmarks/db.py.
+"""
+import argparse
+import importlib
+import json
+import logging
+import math
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .datagen import generate
+from .db import get_engine, use_bench_database
+from .serverless import load_functions, package_module, split_handler
+
+
+def _page(rng, dataset):
+    params = rng.choice(
+        [
+            {"limit": "100"},
+            {"limit": "100", "sort": "-created_on", "fields": "id,name"},
+            {"limit": "100", "service_id": str(rng.randint(1, dataset["services"]))},
+            {"limit": "100", "name_prefix": f"Order {rng.randint(1, 999)}", "sort": "name"},
+            {"ids": ",".join(str(rng.randint(1, dataset["orders"])) for _ in range(50))},
+        ]
+    )
+    return {"queryStringParameters": params}
+
+
+def _order_id(rng, dataset):
+    return {"pk": str(rng.randint(1, dataset["orders"]))}
+
+
+def _new_order(rng, dataset, items=0):
+    return {
+        "name": f"Load Order {rng.random()}",
+        "service_id": rng.randint(1, dataset["services"]),
+        "order_items": [{"name": f"Load Item {i}"} for i in range(items)],
+    }
+
+
+# function name -> (event factory(rng, dataset), maximum number of requests or None)
+SCENARIOS = {
+    "get_all_services": (lambda rng, dataset: {}, None),
+    "get_service": (lambda rng, dataset: {"pathParameters": {"pk": str(rng.randint(1, dataset["services"]))}}, None),
+    "get_all_orders": (_page, None),
+    "get_order_changes": (lambda rng, dataset: {"queryStringParameters": {"limit": "100"}}, None),
+    "get_order": (lambda rng, dataset: {"pathParameters": _order_id(rng, dataset)}, None),
+    "create_order": (lambda rng, dataset: {"body": json.dumps(_new_order(rng, dataset))}, None),
+    "create_orders_bulk": (
+        lambda rng, dataset: {"body": json.dumps({"orders": [_new_order(rng, dataset, 3) for _ in range(100)]})},
+        None,
+    ),
+    "update_orders_status_bulk": (
+        lambda rng, dataset: {
+            "body": json.dumps({"status": "ACTIVE", "ids": [rng.randint(1, dataset["orders"]) for _ in range(100)]})
+        },
+        None,
+    ),
+    "update_order": (
+        lambda rng, dataset: {"pathParameters": _order_id(rng, dataset), "body": json.dumps({"name": "Updated"})},
+        None,
+    ),
+    "delete_order": (lambda rng, dataset: {"pathParameters": _order_id(rng, dataset)}, None),
+    "orders_stats": (
+        lambda rng, dataset: {
+            "queryStringParameters": {"time-period": rng.choice(["THIS_WEEK", "THIS_MONTH", "THIS_YEAR"])}
+        },
+        None,
+    ),
+    "compact_orders_stats": (lambda rng, dataset: {"days": 1}, 5),
+    "export_orders": (lambda rng, dataset: {"format": "ndjson"}, 1),
+}
+
+
+def resolve_handlers(functions):
+    """
+    Returns:
+        Returns dict of function name -> handler callable, raises SystemExit for functions without a scenario.
+    """
+    missing = [function["name"] for function in functions if function["name"] not in SCENARIOS]
+    if missing:
+        raise SystemExit(f"no load test scenario for {missing}, add them to SCENARIOS")
+    handlers = {}
+    for function in functions:
+        module, name = split_handler(function["handler"])
+        handlers[function["name"]] = getattr(importlib.import_module(package_module(module)), name)
+    return handlers
+
+
+def plan_requests(handlers, requests, dataset, rng):
+    """
+    Returns:
+        Returns dict of function name -> list of events.
+    """
+    planned = {}
+    for name in handlers:
+        factory, max_requests = SCENARIOS[name]
+        count = requests if max_requests is None else min(requests, max_requests)
+        planned[name] = [factory(rng, dataset) for _ in range(count)]
+    return planned
+
+
+def invoke(name, handler, event):
+    start = time.perf_counter()
+    response = handler(event, None)
+    elapsed = time.perf_counter() - start
+    status = response.get("statusCode") if isinstance(response, dict) else None
+    return name, elapsed, status
+
+
+def run(calls, concurrency):
+    """
+    Returns:
+        Returns (list of (name, seconds, status), wall seconds of the whole run).
+    """
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(lambda call: invoke(*call), calls))
+    return results, time.perf_counter() - start
+
+
+def percentile(sorted_values, quantile):
+    """Nearest rank percentile of an already sorted list."""
+    return sorted_values[max(0, math.ceil(quantile * len(sorted_values)) - 1)]
+
+
+def summarize(results, wall):
+    """
+    Returns:
+        Returns dict of function name -> requests, errors (5xx or no response), throughput and latency in ms.
+    """
+    by_name = {}
+    for name, elapsed, status in results:
+        by_name.setdefault(name, []).append((elapsed, status))
+    summary = {}
+    for name, samples in by_name.items():
+        latencies = sorted(elapsed * 1000 for elapsed, _ in samples)
+        summary[name] = {
+            "requests": len(samples),
+            "errors": sum(1 for _, status in samples if status is None or status >= 500),
+            "throughput": round(len(samples) / wall, 2),
+            "p50_ms": round(percentile(latencies, 0.5), 2),
+            "p95_ms": round(percentile(latencies, 0.95), 2),
+            "p99_ms": round(percentile(latencies, 0.99), 2),
+            "max_ms": round(latencies[-1], 2),
+        }
+    return summary
+
+
+def find_regressions(summary, baseline, tolerance):
+    """
+    Returns:
+        Returns list of human readable regressions against the baseline.
+    """
+    regressions = []
+    for name, result in summary.items():
+        if result["errors"]:
+            regressions.append(f"{name}: {result['errors']} of {result['requests']} requests failed")
+        expected = baseline.get(name)
+        if expected is None:
+            continue
+        if result["p95_ms"] > expected["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {result['p95_ms']} ms, baseline {expected['p95_ms']} ms")
+        if result["throughput"] < expected["throughput"] * (1 - tolerance):
+            regressions.append(f"{name}: {result['throughput']} req/s, baseline {expected['throughput']} req/s")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", type=int, default=1000000)
+    parser.add_argument("--items", type=int, default=5, help="average order items per seeded order")
+    parser.add_argument("--services", type=int, default=10)
+    parser.add_argument("--skip-seed", action="store_true", help="reuse data of the previous run, no baselines")
+    parser.add_argument("--requests", type=int, default=200, help="requests per function")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--mixed", action="store_true", help="interleave requests of all functions in one run")
+    parser.add_argument("--functions", help="comma separated subset of functions to load")
+    parser.add_argument("--seed", type=int, default=0, help="random seed of the generated requests")
+    parser.add_argument("--baseline", help="JSON file with results of a previous run to compare against")
+    parser.add_argument("--save-baseline", help="write results to this JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+    if args.skip_seed and (args.baseline or args.save_baseline):
+        # data left by the write scenarios of an earlier run would make the results incomparable
+        parser.error("--skip-seed cannot be combined with --baseline or --save-baseline")
+
+    # one pooled connection per worker thread, EMF flushes would interleave with the report
+    os.environ.setdefault("DB_POOL_SIZE", str(args.concurrency))
+    os.environ.setdefault("METRICS_FLUSH_SECONDS", "1e9")
+
+    if not args.skip_seed:
+        print(f"seeding {args.orders} orders with {args.items} items on average", file=sys.stderr)
+        generate(
+            get_engine(connect_args={"local_infile": True}),
+            args.orders,
+            args.items,
+            args.services,
+            distribution="diurnal",
+            rng=random.Random(args.seed),
+        )
+
+    functions = load_functions()
+    if args.functions:
+        selected = args.functions.split(",")
+        functions = [function for function in functions if function["name"] in selected]
+    dataset = {"orders": args.orders, "services": args.services}
+
+    with use_bench_database():
+        handlers = resolve_handlers(functions)
+        logging.getLogger("exampleco.sqltime").setLevel(logging.WARNING)
+        planned = plan_requests(handlers, args.requests, dataset, random.Random(args.seed))
+        if args.mixed:
+            calls = [(name, handlers[name], event) for name, events in planned.items() for event in events]
+            random.Random(args.seed).shuffle(calls)
+            results, wall = run(calls, args.concurrency)
+            summary = summarize(results, wall)
+        else:
+            summary = {}
+            for name, events in planned.items():
+                results, wall = run([(name, handlers[name], event) for event in events], args.concurrency)
+                summary.update(summarize(results, wall))
+
+    header = f"{'function':<28} {'requests':>8} {'errors':>6} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+    print(header)
+    for name, result in summary.items():
+        print(
+            f"{name:<28} {result['requests']:>8} {result['errors']:>6} {result['throughput']:>9.1f} "
+            f"{result['p50_ms']:>9.1f} {result['p95_ms']:>9.1f} {result['p99_ms']:>9.1f}"
+        )
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as file:
+            json.dump(summary, file, indent=2, sort_keys=True)
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+    regressions = find_regressions(summary, baseline, args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}", file=sys.stderr)
+    if regressions:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
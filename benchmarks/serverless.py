@@ -0,0 +1,58 @@
+"""
+Reads function declarations from serverless.yml without a YAML dependency.
+"""
+import os
+import re
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVERLESS_YML = os.path.join(ROOT, "serverless.yml")
+
+FUNCTION_RE = re.compile(r"^  (\w+):\s*$")
+HANDLER_RE = re.compile(r"^\s+handler:\s*(\S+)\s*$")
+PATH_RE = re.compile(r"^\s+path:\s*(\S+)\s*$")
+METHOD_RE = re.compile(r"^\s+method:\s*(\w+)\s*$")
+
+
+def load_functions(path=SERVERLESS_YML):
+    """
+    Returns:
+        Returns list of dicts with name, handler (dotted path), and path/method of the first http event if any.
+    """
+    functions = []
+    in_functions = False
+    with open(path) as file:
+        for line in file:
+            if not line.startswith(" "):
+                in_functions = line.startswith("functions:")
+                continue
+            if not in_functions:
+                continue
+            match = FUNCTION_RE.match(line)
+            if match:
+                functions.append({"name": match.group(1), "handler": None, "path": None, "method": None})
+                continue
+            for key, regex in (("handler", HANDLER_RE), ("path", PATH_RE), ("method", METHOD_RE)):
+                match = regex.match(line)
+                if match and functions and functions[-1][key] is None:
+                    functions[-1][key] = match.group(1)
+    return functions
+
+
+def split_handler(handler):
+    """
+    Returns:
+        Returns (module, function name) of a serverless handler path.
+    """
+    module, _, name = handler.rpartition(".")
+    return module, name
+
+
+def package_module(module):
+    """
+    Handlers are declared relative to the repo root (src.exampleco.exampleco.api...), the same modules
+    are importable from the installed package as exampleco.api... which keeps a single copy of the models.
+
+    Returns:
+        Returns module path inside the exampleco package.
+    """
+    return module.split("src.exampleco.", 1)[-1]
@@ -0,0 +1,52 @@
+import json
+import os
+
+from exampleco import export
+from exampleco.models.database import Session
+from exampleco.utils.decorators import handle_exception
+from exampleco.utils.profiling import instrument
+
+EXPORT_BUCKET = os.environ.get("EXPORT_BUCKET")
+EXPORT_DIRECTORY = "/tmp/export"
+# time left to an invocation when the export stops, enough to upload the open part and answer
+EXPORT_STOP_MARGIN_MS = int(os.environ.get("EXPORT_STOP_MARGIN_MS", "120000"))
+
+
+# pylint: disable=unused-argument
+@handle_exception
+@instrument
+def export_orders(event, context):
+    """
+    Export job for orders and their items.
+    Expects optional event keys: format (ndjson or csv), include_deleted, rows_per_file, prefix, after_id.
+    Parts are uploaded to EXPORT_BUCKET when it is set, otherwise written to EXPORT_DIRECTORY.
+    The export stops EXPORT_STOP_MARGIN_MS before the invocation times out, an incomplete manifest holds
+    the last_id to invoke the job again with as after_id.
+
+    Returns:
+        Returns manifest of written files.
+    """
+    event = event or {}
+    fmt = event.get("format", "ndjson")
+    if fmt not in export.FORMATS:
+        response = {
+            "statusCode": 400,
+            "body": json.dumps({"error": f"format must be one of {list(export.FORMATS)}"}),
+        }
+        return response
+
+    if EXPORT_BUCKET:
+        sink = export.S3Sink(EXPORT_BUCKET, event.get("prefix", "orders/"), os.environ.get("EXPORT_ENDPOINT_URL"))
+    else:
+        sink = export.DirectorySink(EXPORT_DIRECTORY)
+    options = {"include_deleted": bool(event.get("include_deleted"))}
+    if event.get("rows_per_file"):
+        options["rows_per_file"] = int(event["rows_per_file"])
+    if event.get("after_id") is not None:
+        options["after_id"] = int(event["after_id"])
+    if context is not None:
+        options["should_stop"] = lambda: context.get_remaining_time_in_millis() < EXPORT_STOP_MARGIN_MS
+    manifest = export.export_orders(Session, sink, fmt, **options)
+
+    response = {"statusCode": 200, "body": json.dumps(manifest)}
+    return response
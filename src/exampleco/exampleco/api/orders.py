@@ -1,80 +1,486 @@
 import datetime
 import json
+import time
+from functools import lru_cache
 
 from sqlalchemy import and_
+from sqlalchemy import cast
+from sqlalchemy import exists
 from sqlalchemy import func
+from sqlalchemy import Numeric
+from sqlalchemy import or_
+from sqlalchemy import text
 from sqlalchemy.orm import joinedload
-from exampleco.models.database import get_session_maker
-from exampleco.models.database.orders import (
-    Order,
-    OrderSchemaList,
-    OrderSchemaDetail,
-    OrderStatuses,
-)
+from exampleco.models.database import Session
+from exampleco.models.database.catalog import service_catalog
+from exampleco.models.database.orders import Order, OrderItem, OrderStatuses
 from exampleco.models.database.services import Service
-from exampleco.utils.decorators import handle_exception
+from exampleco.models.database.serializers import (
+    ORDER_CHANGE_FIELDS,
+    ORDER_ITEM_FIELDS,
+    ORDER_LIST_FIELDS,
+    cached_serializer,
+    dump_order_change,
+    dump_order_detail,
+    parse_fields,
+    projection,
+)
+from exampleco.models.database.stats import hourly_counts, rebuild_hourly_stats, record_created_orders
+from exampleco.utils.cache import TTLCache
+from exampleco.utils.conditional import (
+    cache_headers,
+    is_conditional,
+    is_not_modified,
+    make_etag,
+    make_version_etag,
+    not_modified,
+)
+from exampleco.utils.decorators import compress_response, handle_exception
+from exampleco.utils.pagination import decode_cursor, encode_cursor, parse_datetime, parse_limit
+from exampleco.utils.profiling import instrument, phase
 
 WEEK = "THIS_WEEK"
 MONTH = "THIS_MONTH"
 YEAR = "THIS_YEAR"
 
-session_maker = get_session_maker()
-Session = session_maker()
+# time-period -> (length of the period, function mapping an hourly bucket to the response bucket)
+STATS_PERIODS = {
+    WEEK: (datetime.timedelta(days=7), lambda bucket: bucket),
+    MONTH: (datetime.timedelta(days=30), lambda bucket: bucket.replace(hour=0)),
+    YEAR: (datetime.timedelta(days=365), lambda bucket: bucket.replace(day=1, hour=0)),
+}
+STATS_COMPACTION_DAYS = 1
+STATS_CACHE_TTL = 60
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+# sort keys of the order list -> cursor value parser, "-" in front of a key sorts descending.
+# Every (filter, sort key) combination is served by one of the orders indexes, see test_indexes.py
+ORDER_SORT_KEYS = {"created_on": parse_datetime, "name": str}
+DEFAULT_ORDER_SORT = "created_on"
+MAX_MULTI_GET_IDS = 500
+MAX_BULK_ORDERS = 5000
+BULK_INSERT_CHUNK_SIZE = 1000
+MAX_BULK_STATUS_IDS = 10000
+DEFAULT_STATUS_CHUNK_SIZE = 1000
+MAX_STATUS_CHUNK_SIZE = 5000
+# seconds a bulk status change may run before returning next_cursor, capped by the Lambda remaining time
+BULK_STATUS_TIME_BUDGET = 20
+
+# modified_on has one second precision and is taken when the statement runs, not when it commits,
+# so the change feed only returns rows older than the longest possible writing transaction (the Lambda timeout)
+CHANGES_SETTLE_SECONDS = 30
+
+# nested fields of order details that can be picked with the fields query parameter
+ORDER_DETAIL_NESTED = {"order_items": ORDER_ITEM_FIELDS}
+
+# read endpoints select only serialized columns, rows skip ORM instantiation and the identity map
+ORDER_CHANGE_COLUMNS = projection(Order, ORDER_CHANGE_FIELDS)
+
+stats_cache = TTLCache("orders_stats", ttl=STATS_CACHE_TTL)
+
+
+def stats_cache_key(time_period, now):
+    """Entries are bucketed by hour because the rollup window moves forward every hour."""
+    return f"{time_period}:{now:%Y-%m-%dT%H}"
+
+
+def invalidate_stats_cache(now):
+    """Drops cached stats of the current hour, the only bucket new orders can land in."""
+    for time_period in STATS_PERIODS:
+        stats_cache.delete(stats_cache_key(time_period, now))
+
+
+def order_filter_conditions(filters):
+    """
+    Builds conditions for the service_id, created_from and created_to filters shared by the order endpoints.
+
+    Returns:
+        Returns list of SQLAlchemy conditions or raises ValueError.
+    """
+    conditions = []
+    if filters.get("service_id") not in (None, ""):
+        try:
+            conditions.append(Order.service_id == int(filters["service_id"]))
+        except (TypeError, ValueError) as exc:
+            raise ValueError("service_id must be an integer.") from exc
+    try:
+        if filters.get("created_from"):
+            conditions.append(Order.created_on >= parse_datetime(filters["created_from"]))
+        if filters.get("created_to"):
+            conditions.append(Order.created_on < parse_datetime(filters["created_to"]))
+    except (TypeError, ValueError) as exc:
+        raise ValueError("created_from and created_to must be ISO 8601 datetimes.") from exc
+    return conditions
+
+
+def name_prefix_condition(prefix):
+    """LIKE with escaped wildcards, so it stays a range scan over the name indexes."""
+    escaped = prefix.replace("/", "//").replace("%", "/%").replace("_", "/_")
+    return Order.name.like(escaped + "%", escape="/")
+
+
+def order_list_conditions(params):
+    """
+    Builds the WHERE clause of the order list from status (ACTIVE by default, DELETED for admin use),
+    service_id, created_from, created_to and name_prefix query parameters.
+
+    Returns:
+        Returns list of SQLAlchemy conditions or raises ValueError.
+    """
+    try:
+        status = OrderStatuses(params.get("status") or OrderStatuses.ACTIVE.value)
+    except ValueError as exc:
+        raise ValueError(f"status must be one of {[status.value for status in OrderStatuses]}.") from exc
+    conditions = [Order.status == status] + order_filter_conditions(params)
+    if params.get("name_prefix"):
+        conditions.append(name_prefix_condition(params["name_prefix"]))
+    return conditions
+
+
+def parse_sort(value):
+    """
+    Returns:
+        Returns whitelisted sort key, DEFAULT_ORDER_SORT if value is empty, or raises ValueError.
+    """
+    sort = value or DEFAULT_ORDER_SORT
+    if sort.lstrip("-") not in ORDER_SORT_KEYS or sort.startswith("--"):
+        allowed = [prefix + key for key in ORDER_SORT_KEYS for prefix in ("", "-")]
+        raise ValueError(f"sort must be one of {allowed}.")
+    return sort
+
+
+def orders_page_query(limit, cursor=None, fields=ORDER_LIST_FIELDS, conditions=None, sort=DEFAULT_ORDER_SORT):
+    """
+    Builds keyset paginated query for orders matching conditions (active orders by default)
+    ordered by (sort key, id), both ascending or both descending.
+    Backed by the (status, [service_id,] sort key, id) indexes so every page costs the same regardless of depth.
+    One extra row is requested to find out whether there is a next page.
+    Selects columns of fields plus the cursor columns, so rows are plain named tuples.
+    """
+    key = sort.lstrip("-")
+    column = getattr(Order, key)
+    descending = sort.startswith("-")
+    if conditions is None:
+        conditions = [Order.is_active]
+    query = Session.query(*projection(Order, fields, extra=(key, "id"))).filter(and_(*conditions))
+    if cursor is not None:
+        value, order_id = cursor
+        if descending:
+            after = or_(column < value, and_(column == value, Order.id < order_id))
+        else:
+            after = or_(column > value, and_(column == value, Order.id > order_id))
+        query = query.filter(after)
+    if descending:
+        query = query.order_by(column.desc(), Order.id.desc())
+    else:
+        query = query.order_by(column, Order.id)
+    return query.limit(limit + 1)
+
+
+def parse_ids(value):
+    """
+    Parses comma separated ids query parameter, duplicates are dropped.
+
+    Returns:
+        Returns list of ids in request order or raises ValueError.
+    """
+    try:
+        ids = list(dict.fromkeys(int(order_id) for order_id in value.split(",")))
+    except ValueError as exc:
+        raise ValueError("ids must be a comma separated list of integers.") from exc
+    if len(ids) > MAX_MULTI_GET_IDS:
+        raise ValueError(f"at most {MAX_MULTI_GET_IDS} ids can be requested at once.")
+    return ids
+
+
+def load_order_details(order_ids, fields=ORDER_LIST_FIELDS, item_fields=ORDER_ITEM_FIELDS):
+    """
+    Reads active orders and their items with two column queries regardless of the number of ids.
+    Items are not queried at all when item_fields is None.
+    id and modified_on are always selected, they are needed to group items and build validators.
+
+    Returns:
+        Returns dict of order id -> (order row, list of item rows).
+    """
+    orders = (
+        Session.query(*projection(Order, fields, extra=("id", "modified_on")))
+        .filter(and_(Order.id.in_(order_ids), Order.is_active))
+        .all()
+    )
+    details = {order.id: (order, []) for order in orders}
+    if item_fields is not None and details:
+        items = (
+            Session.query(*projection(OrderItem, item_fields, extra=("order_id", "modified_on")))
+            .filter(OrderItem.order_id.in_(list(details)))
+            .order_by(OrderItem.id)
+        )
+        for item in items:
+            details[item.order_id][1].append(item)
+    return details
+
+
+def detail_dumper(fields=ORDER_LIST_FIELDS, item_fields=ORDER_ITEM_FIELDS):
+    """
+    Returns:
+        Returns function mapping an (order row, item rows) pair of load_order_details to a dict.
+    """
+    dump = cached_serializer(fields)
+    if item_fields is None:
+        return lambda order, items: dump(order)
+    dump_item = cached_serializer(item_fields)
+
+    def dump_detail(order, items):
+        result = dump(order)
+        result["order_items"] = [dump_item(item) for item in items]
+        return result
+
+    return dump_detail
+
+
+def get_orders_by_ids(order_ids, fields=ORDER_LIST_FIELDS, item_fields=ORDER_ITEM_FIELDS):
+    """
+    Batch read of active orders with their items in two queries regardless of the number of ids.
+
+    Returns:
+        Returns response body with found orders in request order and an error for every id that was not found.
+    """
+    with phase("query"):
+        details = load_order_details(order_ids, fields, item_fields)
+    with phase("serialize"):
+        dump_detail = detail_dumper(fields, item_fields)
+        results = []
+        errors = {}
+        for order_id in order_ids:
+            detail = details.get(order_id)
+            if detail is None:
+                errors[order_id] = f"order with id {order_id} does not exist."
+            else:
+                results.append(dump_detail(*detail))
+    return {"results": results, "errors": errors}
 
 
 # pylint: disable=unused-argument
 @handle_exception
+@instrument
+@compress_response
 def get_all_orders(event, context):
     """
     List endpoint for orders.
+    Accepts optional limit and cursor query parameters.
+    With ids query parameter (e.g. ids=1,2,3) returns those orders with their items instead of a page.
+    Optional fields query parameter (e.g. fields=id,name or fields=id,order_items.name with ids)
+    limits both the selected columns and the response to the listed fields.
+    Pages can be filtered by status, service_id, created_from, created_to and name_prefix
+    and sorted by one of ORDER_SORT_KEYS, cursors are only valid for the filters and sort they were issued for.
 
     Returns:
-        Returns a list of all orders pulled from the database.
+        Returns a page of active orders and next_cursor to fetch the following page (null on the last page).
     """
+    params = event.get("queryStringParameters") or {}
+    if params.get("ids"):
+        try:
+            with phase("parse"):
+                order_ids = parse_ids(params["ids"])
+                fields, nested = parse_fields(params.get("fields"), ORDER_LIST_FIELDS, ORDER_DETAIL_NESTED)
+        except ValueError as exc:
+            response = {"statusCode": 400, "body": json.dumps({"error": str(exc)})}
+            return response
+        body = get_orders_by_ids(order_ids, fields, nested.get("order_items"))
+        with phase("encode"):
+            response = {"statusCode": 200, "body": json.dumps(body)}
+        return response
+
+    try:
+        with phase("parse"):
+            fields, _ = parse_fields(params.get("fields"), ORDER_LIST_FIELDS)
+            conditions = order_list_conditions(params)
+            sort = parse_sort(params.get("sort"))
+            key = sort.lstrip("-")
+            limit = parse_limit(params.get("limit"), DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+            cursor = decode_cursor(params["cursor"], (ORDER_SORT_KEYS[key], int)) if params.get("cursor") else None
+    except ValueError as exc:
+        response = {"statusCode": 400, "body": json.dumps({"error": str(exc)})}
+        return response
+
+    with phase("query"):
+        orders = orders_page_query(limit, cursor, fields, conditions, sort).all()
+    next_cursor = None
+    if len(orders) > limit:
+        orders = orders[:limit]
+        next_cursor = encode_cursor((getattr(orders[-1], key), orders[-1].id))
 
-    orders_schema = OrderSchemaList(many=True)
-    orders = Session.query(Order).filter(Order.is_active)
-    results = orders_schema.dump(orders)
+    with phase("serialize"):
+        dump = cached_serializer(fields)
+        results = [dump(order) for order in orders]
 
-    response = {"statusCode": 200, "body": json.dumps(results)}
+    with phase("encode"):
+        response = {"statusCode": 200, "body": json.dumps({"results": results, "next_cursor": next_cursor})}
 
     return response
 
 
+def order_changes_query(limit, cursor=None):
+    """
+    Builds keyset paginated query for orders of any status ordered by (modified_on, id).
+    Backed by ix_orders_modified_on_id. Rows modified in the last CHANGES_SETTLE_SECONDS are left
+    for the next poll so a commit that lands late never ends up behind a returned cursor.
+    One extra row is requested to find out whether there are more changes.
+    """
+    settled = func.date_sub(func.now(), text(f"INTERVAL {CHANGES_SETTLE_SECONDS} SECOND"))
+    query = Session.query(*ORDER_CHANGE_COLUMNS).filter(Order.modified_on < settled)
+    if cursor is not None:
+        modified_on, order_id = cursor
+        query = query.filter(
+            or_(
+                Order.modified_on > modified_on,
+                and_(Order.modified_on == modified_on, Order.id > order_id),
+            )
+        )
+    return query.order_by(Order.modified_on, Order.id).limit(limit + 1)
+
+
 # pylint: disable=unused-argument
 @handle_exception
-def get_order(event, context):
+@instrument
+@compress_response
+def get_order_changes(event, context):
     """
-    Detail endpoint for orders.
-    Expects order_id in path arguments.
+    Change feed for orders, lists created, updated and soft deleted orders in modification order.
+    Accepts optional limit and since query parameters, since is the next_cursor of the previous call.
 
     Returns:
-        Returns an order with given id or 404.
+        Returns a page of changed orders, next_cursor to poll with and has_more
+        (next_cursor is null only if no order has changed yet).
     """
-    order_id = event["pathParameters"]["pk"]
+    params = event.get("queryStringParameters") or {}
+    try:
+        limit = parse_limit(params.get("limit"), DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+        cursor = decode_cursor(params["since"], (parse_datetime, int)) if params.get("since") else None
+    except ValueError as exc:
+        response = {"statusCode": 400, "body": json.dumps({"error": str(exc)})}
+        return response
+
+    orders = order_changes_query(limit, cursor).all()
+    has_more = len(orders) > limit
+    orders = orders[:limit]
+    next_cursor = encode_cursor((orders[-1].modified_on, orders[-1].id)) if orders else params.get("since")
+
+    results = [dump_order_change(order) for order in orders]
+
+    response = {
+        "statusCode": 200,
+        "body": json.dumps({"results": results, "next_cursor": next_cursor, "has_more": has_more}),
+    }
+    return response
+
+
+def order_validators(order_id, modified_on, items_count, items_modified_on, fields, item_fields):
+    """
+    Selected fields are part of the ETag, every sparse fieldset is a representation of its own.
+    When items are selected their count and latest change go into the validators too.
+    The ETag is weak, modified_on only tells writes apart that are at least a second apart.
+
+    Returns:
+        Returns (etag, last_modified) of an order detail.
+    """
+    if item_fields is None:
+        items_count = items_modified_on = None
+    else:
+        item_fields = [name for name, _ in item_fields]
+    fields = [name for name, _ in fields]
+    etag = make_version_etag("order", order_id, modified_on, items_count, items_modified_on, fields, item_fields)
+    last_modified = max(modified_on, items_modified_on) if items_modified_on is not None else modified_on
+    return etag, last_modified
+
+
+def get_order_version(order_id):
+    """
+    Aggregate read of what an order detail depends on, answers conditional requests without loading items.
+
+    Returns:
+        Returns (id, modified_on, items count, items max modified_on) of an active order or None.
+    """
+    return (
+        Session.query(Order.id, Order.modified_on, func.count(OrderItem.id), func.max(OrderItem.modified_on))
+        .outerjoin(OrderItem, OrderItem.order_id == Order.id)
+        .filter(and_(Order.id == order_id, Order.is_active))
+        .group_by(Order.id)
+        .first()
+    )
 
-    orders_schema = OrderSchemaDetail(many=False)
-    order = (
+
+def get_active_order(order_id):
+    """
+    Returns:
+        Returns active order with its items loaded in the same query or None.
+    """
+    return (
         Session.query(Order)
         .filter(and_(Order.id == order_id, Order.is_active))
         .options(joinedload(Order.order_items))
         .first()
     )
 
-    if not order:
+
+# pylint: disable=unused-argument
+@handle_exception
+@instrument
+@compress_response
+def get_order(event, context):
+    """
+    Detail endpoint for orders.
+    Expects order_id in path arguments.
+    Accepts optional fields query parameter, e.g. fields=id,name or fields=order_items.name.
+    Items are not queried when no item field is requested.
+    Supports If-None-Match / If-Modified-Since, a matching request is answered by one aggregate query.
+
+    Returns:
+        Returns an order with given id, 304 or 404.
+    """
+    order_id = event["pathParameters"]["pk"]
+    params = event.get("queryStringParameters") or {}
+    try:
+        with phase("parse"):
+            fields, nested = parse_fields(params.get("fields"), ORDER_LIST_FIELDS, ORDER_DETAIL_NESTED)
+    except ValueError as exc:
+        response = {"statusCode": 400, "body": json.dumps({"error": str(exc)})}
+        return response
+    item_fields = nested.get("order_items")
+
+    if is_conditional(event):
+        with phase("query"):
+            version = get_order_version(order_id)
+        if version is not None:
+            etag, last_modified = order_validators(*version, fields, item_fields)
+            if is_not_modified(event, etag, last_modified):
+                return not_modified(etag, last_modified)
+
+    with phase("query"):
+        detail = next(iter(load_order_details([order_id], fields, item_fields).values()), None)
+
+    if not detail:
         response = {
             "statusCode": 404,
             "body": json.dumps({"error": f"order with id {order_id} does not exist."}),
         }
         return response
 
-    result = orders_schema.dump(order)
-    response = {"statusCode": 200, "body": json.dumps(result)}
+    order, items = detail
+    items_modified_on = max((item.modified_on for item in items), default=None)
+    etag, last_modified = order_validators(
+        order.id, order.modified_on, len(items), items_modified_on, fields, item_fields
+    )
+    with phase("serialize"):
+        result = detail_dumper(fields, item_fields)(order, items)
+    with phase("encode"):
+        response = {"statusCode": 200, "headers": cache_headers(etag, last_modified), "body": json.dumps(result)}
 
     return response
 
 
 @handle_exception
+@instrument
 def create_order(event, context):
     """
     Create order endpoint.
@@ -86,7 +492,7 @@ def create_order(event, context):
     body = json.loads(event["body"])
     name = body["name"]
     service_id = body["service_id"]
-    service = Session.query(Service).filter(Service.id == service_id).first()
+    service = service_catalog.get(Session, service_id)
     if not service:
         response = {
             "statusCode": 400,
@@ -95,75 +501,216 @@ def create_order(event, context):
         return response
     order = Order(name=name, service_id=service_id)
     Session.add(order)
+    Session.flush()
+    record_created_orders(Session, [order.id])
     Session.commit()
+    invalidate_stats_cache(datetime.datetime.now())
 
-    orders_schema = OrderSchemaDetail(many=False)
-    result = orders_schema.dump(order)
+    result = dump_order_detail(order)
     response = {"statusCode": 201, "body": json.dumps(result)}
     return response
 
 
+def service_prices(service_ids):
+    """
+    Reads prices with one IN query in the current transaction rather than from the service catalog,
+    whose cached prices can be revalidate_after seconds old. MySQL rounds them to cents like the backfill did.
+
+    Returns:
+        Returns dict of service id -> Decimal price of the services that exist.
+    """
+    return dict(Session.query(Service.id, cast(Service.price, Numeric(12, 2))).filter(Service.id.in_(service_ids)))
+
+
+def priced_items(order, prices):
+    """
+    Returns:
+        Returns insert values of the order's items, service_id defaults to the order's and price is its snapshot.
+    """
+    items = []
+    for item in order.get("order_items", []):
+        service_id = item.get("service_id", order["service_id"])
+        items.append({"name": item["name"], "service_id": service_id, "price": prices[service_id]})
+    return items
+
+
+@lru_cache(maxsize=1)
+def auto_increment_step():
+    """
+    Read once per process, multi-primary setups space auto-increment values by more than one.
+
+    Returns:
+        Returns @@auto_increment_increment of the server.
+    """
+    return int(Session.execute(text("SELECT @@auto_increment_increment")).scalar())
+
+
+def insert_orders(orders, prices):
+    """
+    Inserts orders and their items with multi-row INSERTs in the current transaction.
+    Items store the price of their service from prices (service id -> price) and order totals are computed
+    from them here, so maintaining totals costs no extra statement.
+    Ids of a chunk are derived from LAST_INSERT_ID() and auto_increment_step(), which relies on InnoDB
+    allocating evenly spaced auto-increment values to a multi-row INSERT
+    (innodb_autoinc_lock_mode 0 or 1, the MySQL 5.7 default).
+
+    Returns:
+        Returns ids of inserted orders in input order.
+    """
+    order_ids = []
+    step = auto_increment_step()
+    for start in range(0, len(orders), BULK_INSERT_CHUNK_SIZE):
+        chunk = orders[start : start + BULK_INSERT_CHUNK_SIZE]
+        chunk_items = [priced_items(order, prices) for order in chunk]
+        result = Session.execute(
+            Order.__table__.insert().values(
+                [
+                    {
+                        "name": order["name"],
+                        "service_id": order["service_id"],
+                        "total": sum(item["price"] for item in items),
+                    }
+                    for order, items in zip(chunk, chunk_items)
+                ]
+            )
+        )
+        chunk_ids = range(result.lastrowid, result.lastrowid + len(chunk) * step, step)
+        items = [dict(item, order_id=order_id) for items, order_id in zip(chunk_items, chunk_ids) for item in items]
+        if items:
+            Session.execute(OrderItem.__table__.insert().values(items))
+        order_ids.extend(chunk_ids)
+    return order_ids
+
+
 @handle_exception
-def update_order(event, context):
+@instrument
+def create_orders_bulk(event, context):
     """
-    Update order endpoint.
-    Expects body {"name": string, "service_id": int} and pk in path.
+    Bulk create orders endpoint.
+    Expects body {"orders": [{"name": string, "service_id": int, "order_items": [{"name": string, "service_id": int}]}]}
+    with at most MAX_BULK_ORDERS orders, service_id of an item defaults to the one of its order.
+    All orders are created in one transaction or none is.
 
     Returns:
-        Returns updated order.
+        Returns ids of created orders in request order.
     """
-    order_id = event["pathParameters"]["pk"]
+    body = json.loads(event["body"])
+    orders = body["orders"]
+    if not 1 <= len(orders) <= MAX_BULK_ORDERS:
+        response = {
+            "statusCode": 400,
+            "body": json.dumps({"error": f"orders must contain from 1 to {MAX_BULK_ORDERS} orders."}),
+        }
+        return response
 
-    order = Session.query(Order).filter(and_(Order.id == order_id, Order.is_active)).first()
-    if not order:
+    service_ids = {order["service_id"] for order in orders}
+    service_ids.update(
+        item["service_id"] for order in orders for item in order.get("order_items", []) if "service_id" in item
+    )
+    prices = service_prices(service_ids)
+    missing = sorted(service_ids - prices.keys())
+    if missing:
         response = {
-            "statusCode": 404,
-            "body": json.dumps({"error": f"order with id {order_id} does not exist."}),
+            "statusCode": 400,
+            "body": json.dumps({"error": f"Services with ids {missing} do not exist."}),
         }
         return response
 
+    order_ids = insert_orders(orders, prices)
+    record_created_orders(Session, order_ids)
+    Session.commit()
+    invalidate_stats_cache(datetime.datetime.now())
+
+    response = {"statusCode": 201, "body": json.dumps({"ids": order_ids})}
+    return response
+
+
+@handle_exception
+@instrument
+def update_order(event, context):
+    """
+    Update order endpoint.
+    Expects body {"name": string, "service_id": int} and pk in path.
+    Changes are applied with one conditional UPDATE that also checks the service exists,
+    the order is only read back after commit to build the response.
+
+    Returns:
+        Returns updated order.
+    """
+    order_id = event["pathParameters"]["pk"]
     body = json.loads(event["body"])
     name = body.get("name")
     service_id = body.get("service_id")
+
+    values = {}
+    condition = and_(Order.id == order_id, Order.is_active)
+    if name is not None:
+        values[Order.name] = name
     if service_id is not None:
-        service = Session.query(Service).filter(Service.id == service_id).first()
-        if not service:
+        values[Order.service_id] = service_id
+        condition = and_(condition, exists().where(Service.id == service_id))
+
+    if values:
+        updated = Session.query(Order).filter(condition).update(values, synchronize_session=False)
+    else:
+        updated = Session.query(Order.id).filter(condition).first() is not None
+
+    if not updated:
+        order_exists = (
+            service_id is not None
+            and Session.query(Order.id).filter(and_(Order.id == order_id, Order.is_active)).first() is not None
+        )
+        if order_exists:
             response = {
                 "statusCode": 400,
                 "body": json.dumps({"error": f"Service with id {service_id} does not exist."}),
             }
             return response
-        order.service_id = service_id
-    if name is not None:
-        order.name = name
+        response = {
+            "statusCode": 404,
+            "body": json.dumps({"error": f"order with id {order_id} does not exist."}),
+        }
+        return response
 
     Session.commit()
 
-    orders_schema = OrderSchemaDetail(many=False)
-    result = orders_schema.dump(order)
+    order = get_active_order(order_id)
+    if order is None:
+        # soft deleted by a concurrent request between the commit and the read back
+        response = {
+            "statusCode": 404,
+            "body": json.dumps({"error": f"order with id {order_id} does not exist."}),
+        }
+        return response
+    result = dump_order_detail(order)
     response = {"statusCode": 200, "body": json.dumps(result)}
     return response
 
 
 @handle_exception
+@instrument
 def delete_order(event, context):
     """
     Delete order endpoint.
     Expects pk in path.
+    Soft deletes with one conditional UPDATE, affected rows tell whether the order existed.
 
     Returns:
         Returns 204 response.
     """
     order_id = event["pathParameters"]["pk"]
 
-    order = Session.query(Order).filter(and_(Order.id == order_id, Order.is_active)).first()
-    if not order:
+    deleted = (
+        Session.query(Order)
+        .filter(and_(Order.id == order_id, Order.is_active))
+        .update({Order.status: OrderStatuses.DELETED}, synchronize_session=False)
+    )
+    if not deleted:
         response = {
             "statusCode": 404,
             "body": json.dumps({"error": f"order with id {order_id} does not exist."}),
         }
         return response
-    order.status = OrderStatuses.DELETED
     Session.commit()
     response = {
         "statusCode": 204,
@@ -171,16 +718,104 @@ def delete_order(event, context):
     return response
 
 
+def bulk_status_condition(body):
+    """
+    Builds the WHERE clause of a bulk status change from either "ids" or "filter" in the request body.
+
+    Returns:
+        Returns SQLAlchemy condition or raises ValueError.
+    """
+    if "ids" in body:
+        ids = body["ids"]
+        if not 1 <= len(ids) <= MAX_BULK_STATUS_IDS:
+            raise ValueError(f"ids must contain from 1 to {MAX_BULK_STATUS_IDS} ids.")
+        return Order.id.in_(ids)
+    conditions = order_filter_conditions(body.get("filter") or {})
+    if not conditions:
+        raise ValueError("either ids or a filter by service_id, created_from, created_to is required.")
+    return and_(*conditions)
+
+
+@handle_exception
+@instrument
+def update_orders_status_bulk(event, context):
+    """
+    Bulk status change endpoint, e.g. to soft delete many orders at once.
+    Expects body {"status": "ACTIVE"|"DELETED", "ids": [int]} or
+    {"status": ..., "filter": {"service_id": int, "created_from": datetime, "created_to": datetime}},
+    optionally with "chunk_size" and the "cursor" returned by the previous call.
+    Orders are updated in id order by chunked UPDATEs, each committed on its own so row locks
+    are held for one chunk only. When the time budget runs out the response carries next_cursor.
+
+    Returns:
+        Returns number of updated orders and next_cursor (null when done).
+    """
+    body = json.loads(event["body"])
+    try:
+        status = OrderStatuses(body.get("status"))
+        condition = bulk_status_condition(body)
+        chunk_size = parse_limit(
+            body.get("chunk_size"), DEFAULT_STATUS_CHUNK_SIZE, MAX_STATUS_CHUNK_SIZE, name="chunk_size"
+        )
+        (last_id,) = decode_cursor(body["cursor"], (int,)) if body.get("cursor") else (0,)
+    except ValueError as exc:
+        response = {"statusCode": 400, "body": json.dumps({"error": str(exc)})}
+        return response
+
+    time_budget = BULK_STATUS_TIME_BUDGET
+    if context is not None:
+        time_budget = min(time_budget, context.get_remaining_time_in_millis() / 1000 - 5)
+    deadline = time.monotonic() + time_budget
+
+    updated = 0
+    chunks = 0
+    next_cursor = None
+    while True:
+        ids = [
+            order_id
+            for order_id, in Session.query(Order.id)
+            .filter(and_(condition, Order.id > last_id, Order.status != status))
+            .order_by(Order.id)
+            .limit(chunk_size)
+        ]
+        if not ids:
+            break
+        updated += (
+            Session.query(Order)
+            .filter(and_(Order.id.in_(ids), Order.status != status))
+            .update({Order.status: status}, synchronize_session=False)
+        )
+        Session.commit()
+        chunks += 1
+        last_id = ids[-1]
+        if len(ids) < chunk_size:
+            break
+        if time.monotonic() >= deadline:
+            next_cursor = encode_cursor((last_id,))
+            break
+
+    response = {
+        "statusCode": 200,
+        "body": json.dumps({"updated": updated, "chunks": chunks, "next_cursor": next_cursor}),
+    }
+    return response
+
+
 @handle_exception
+@instrument
+@compress_response
 def orders_stats(event, context):
     """
     Endpoint that can be used by the frontend to display the number of created orders over time.
     Expects time-period query parameter with possible values THIS_WEEK, THIS_MONTH, THIS_YEAR.
+    Reads the hourly rollup table, so the period is aligned to the hour.
+    Responses are cached for STATS_CACHE_TTL seconds together with their ETag, If-None-Match is honoured.
 
     Returns:
-        Returns number of orders in buckets.
+        Returns number of orders in buckets or 304.
     """
-    time_period = event["queryStringParameters"].get("time-period")
+    params = event.get("queryStringParameters") or {}
+    time_period = params.get("time-period")
     allowed_periods = [WEEK, MONTH, YEAR]
 
     if time_period not in allowed_periods:
@@ -189,55 +824,41 @@ def orders_stats(event, context):
             "body": json.dumps({"error": f"time-period must be one of {allowed_periods}"}),
         }
         return response
-    response_data = {}
     now = datetime.datetime.now()
-    if time_period == WEEK:
-        group_by_clauses = [
-            func.year(Order.created_on),
-            func.month(Order.created_on),
-            func.dayofmonth(Order.created_on),
-            func.hour(Order.created_on),
-        ]
-        result = (
-            Session.query(*group_by_clauses, func.count(Order.id))
-            .filter(Order.created_on > now - datetime.timedelta(days=7))
-            .group_by(*group_by_clauses)
-            .all()
-        )
-        for row in result:
-            year, month, day, hour, count = row
-            dtm = datetime.datetime(year=year, month=month, day=day, hour=hour).isoformat()
-            response_data[dtm] = count
-    if time_period == MONTH:
-        group_by_clauses = [
-            func.year(Order.created_on),
-            func.month(Order.created_on),
-            func.dayofmonth(Order.created_on),
-        ]
-        result = (
-            Session.query(*group_by_clauses, func.count(Order.id))
-            .filter(Order.created_on > now - datetime.timedelta(days=30))
-            .group_by(*group_by_clauses)
-            .all()
-        )
-        for row in result:
-            year, month, day, count = row
-            dtm = datetime.datetime(year=year, month=month, day=day).isoformat()
-            response_data[dtm] = count
-    if time_period == YEAR:
-        group_by_clauses = [
-            func.year(Order.created_on),
-            func.month(Order.created_on),
-        ]
-        result = (
-            Session.query(*group_by_clauses, func.count(Order.id))
-            .filter(Order.created_on > now - datetime.timedelta(days=365))
-            .group_by(*group_by_clauses)
-            .all()
-        )
-        for row in result:
-            year, month, count = row
-            dtm = datetime.datetime(year=year, month=month, day=1).isoformat()
-            response_data[dtm] = count
-    response = {"statusCode": 200, "body": json.dumps(response_data)}
+    cache_key = stats_cache_key(time_period, now)
+    cached = stats_cache.get(cache_key)
+    if cached is None:
+        period, to_bucket = STATS_PERIODS[time_period]
+        response_data = {}
+        for bucket, count in hourly_counts(Session, now - period):
+            dtm = to_bucket(bucket).isoformat()
+            response_data[dtm] = response_data.get(dtm, 0) + count
+        body = json.dumps(response_data)
+        cached = (body, make_etag(body))
+        stats_cache.set(cache_key, cached)
+    body, etag = cached
+    if is_not_modified(event, etag):
+        return not_modified(etag)
+    response = {"statusCode": 200, "headers": cache_headers(etag), "body": body}
+    return response
+
+
+@handle_exception
+@instrument
+def compact_orders_stats(event, context):
+    """
+    Scheduled job that recomputes recent hourly order counts from the orders table.
+    Accepts optional "days" in the event, defaults to STATS_COMPACTION_DAYS.
+
+    Returns:
+        Returns 204 response.
+    """
+    days = int((event or {}).get("days", STATS_COMPACTION_DAYS))
+    now = datetime.datetime.now()
+    rebuild_hourly_stats(Session, now - datetime.timedelta(days=days))
+    Session.commit()
+    invalidate_stats_cache(now)
+    response = {
+        "statusCode": 204,
+    }
     return response
@@ -1,46 +1,58 @@
 import json
 
-from exampleco.models.database import get_session_maker
-from exampleco.models.database.services import Service, ServiceSchema
-from exampleco.utils.decorators import handle_exception
-
-session_maker = get_session_maker()
-Session = session_maker()
+from exampleco.models.database import Session
+from exampleco.models.database.catalog import service_catalog
+from exampleco.models.database.serializers import dump_service
+from exampleco.utils.conditional import cache_headers, is_not_modified, make_version_etag, not_modified
+from exampleco.utils.decorators import compress_response, handle_exception
+from exampleco.utils.profiling import instrument, phase
 
 
 # pylint: disable=unused-argument
 @handle_exception
+@instrument
+@compress_response
 def get_all_services(event, context):
     """
     List endpoint for services.
+    Supports If-None-Match, the weak ETag is derived from the catalog version.
+    No Last-Modified is sent, deleting a service does not move max(modified_on) but changes the ETag.
 
     Returns:
-        Returns a list of all services pulled from the database.
+        Returns a list of all services pulled from the services catalog cache or 304.
     """
+    with phase("query"):
+        version = service_catalog.current_version(Session)
+    etag = make_version_etag("services", *version)
+    if is_not_modified(event, etag):
+        return not_modified(etag)
 
-    services_schema = ServiceSchema(many=True)
-    services = Session.query(Service).all()
-    results = services_schema.dump(services)
+    with phase("query"):
+        services = service_catalog.all(Session)
+    with phase("serialize"):
+        results = [dump_service(service) for service in services]
 
-    response = {"statusCode": 200, "body": json.dumps(results)}
+    with phase("encode"):
+        response = {"statusCode": 200, "headers": cache_headers(etag), "body": json.dumps(results)}
 
     return response
 
 
 # pylint: disable=unused-argument
 @handle_exception
+@instrument
 def get_service(event, context):
     """
     Detail endpoint for services.
     Expects service_id in path arguments.
+    Supports If-None-Match / If-Modified-Since, validators are derived from id and modified_on (weak ETag).
 
     Returns:
-        Returns a service with given id or 404.
+        Returns a service with given id, 304 or 404.
     """
     service_id = event["pathParameters"]["pk"]
 
-    services_schema = ServiceSchema(many=False)
-    service = Session.query(Service).filter(Service.id == service_id).first()
+    service = service_catalog.get(Session, service_id)
 
     if not service:
         response = {
@@ -49,7 +61,11 @@ def get_service(event, context):
         }
         return response
 
-    result = services_schema.dump(service)
-    response = {"statusCode": 200, "body": json.dumps(result)}
+    etag = make_version_etag("service", service.id, service.modified_on)
+    if is_not_modified(event, etag, service.modified_on):
+        return not_modified(etag, service.modified_on)
+
+    result = dump_service(service)
+    response = {"statusCode": 200, "headers": cache_headers(etag, service.modified_on), "body": json.dumps(result)}
 
     return response
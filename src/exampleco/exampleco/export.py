@@ -0,0 +1,246 @@
+"""
+Streaming export of orders with their items as NDJSON or CSV.
+
+Rows are read through a server side cursor and written out as they arrive, so memory use does not
+depend on the number of orders. Output is split into part files of at most rows_per_file orders.
+An export can stop early and be resumed, the manifest holds the order id it got up to as last_id, pass it as --after-id.
+
+Usage: python -m exampleco.export --format ndjson --out ./export [--all] [--after-id ID]
+"""
+import argparse
+import csv
+import json
+import os
+import tempfile
+from collections import namedtuple
+
+from sqlalchemy import func
+
+from exampleco.models.database import create_session
+from exampleco.models.database.orders import Order, OrderItem
+from exampleco.models.database.serializers import compile_serializer, enum_value, isoformat, projection
+
+FORMATS = ("ndjson", "csv")
+# parts are uploaded while the streaming cursor waits, smaller parts keep every pause short
+# and fit the 512 MB /tmp of Lambda where S3Sink stages them
+DEFAULT_ROWS_PER_FILE = 200000
+DEFAULT_YIELD_PER = 5000
+# seconds MySQL waits for the client to read the next rows before dropping the connection, raised for the
+# export session from the default 60 so uploading a part cannot time out the cursor (900 is the Lambda limit)
+EXPORT_NET_WRITE_TIMEOUT = 900
+# span of order ids read by one streaming query, should_stop is asked between them. A streaming query cannot
+# be abandoned cheaply, PyMySQL reads all of its remaining rows before the connection can run the next statement
+EXPORT_BATCH_IDS = 50000
+
+
+ORDER_EXPORT_FIELDS = (
+    ("id", None),
+    ("name", None),
+    ("service_id", None),
+    ("status", enum_value),
+    ("total", float),
+    ("created_on", isoformat),
+    ("modified_on", isoformat),
+)
+ITEM_EXPORT_FIELDS = (
+    ("id", None),
+    ("name", None),
+    ("service_id", None),
+    ("price", float),
+    ("created_on", isoformat),
+    ("modified_on", isoformat),
+)
+dump_export_order = compile_serializer(ORDER_EXPORT_FIELDS)
+dump_export_item = compile_serializer(ITEM_EXPORT_FIELDS)
+# item columns of a joined row, unlabelled so dump_export_item can read them by field name
+ExportItem = namedtuple("ExportItem", [name for name, _ in ITEM_EXPORT_FIELDS])
+CSV_HEADER = [name for name, _ in ORDER_EXPORT_FIELDS] + [f"item_{name}" for name, _ in ITEM_EXPORT_FIELDS]
+
+
+def export_query(session, include_deleted=False, after_id=None, up_to_id=None, yield_per=DEFAULT_YIELD_PER):
+    """
+    Orders with id in (after_id, up_to_id] left joined with their items, ordered by order id only so MySQL can stream
+    rows in primary key order without sorting. Items of an order are consecutive but in no guaranteed order,
+    ordering by item id too would sort the whole join in a temporary table first.
+    """
+    columns = projection(Order, ORDER_EXPORT_FIELDS) + [
+        column.label(f"item_{column.key}") for column in projection(OrderItem, ITEM_EXPORT_FIELDS)
+    ]
+    query = session.query(*columns).outerjoin(OrderItem, OrderItem.order_id == Order.id)
+    if not include_deleted:
+        query = query.filter(Order.is_active)
+    if after_id is not None:
+        query = query.filter(Order.id > after_id)
+    if up_to_id is not None:
+        query = query.filter(Order.id <= up_to_id)
+    return query.order_by(Order.id).execution_options(stream_results=True).yield_per(yield_per)
+
+
+def _item(row):
+    if row.item_id is None:
+        return None
+    return dump_export_item(ExportItem._make(row[len(ORDER_EXPORT_FIELDS) :]))
+
+
+def iter_orders(rows):
+    """
+    Groups consecutive joined rows of the same order.
+
+    Yields:
+        Yields (order dict, list of item dicts).
+    """
+    order = None
+    items = []
+    for row in rows:
+        if order is None or order["id"] != row.id:
+            if order is not None:
+                yield order, items
+            order = dump_export_order(row)
+            items = []
+        item = _item(row)
+        if item is not None:
+            items.append(item)
+    if order is not None:
+        yield order, items
+
+
+def write_ndjson(file, order, items):
+    file.write(json.dumps(dict(order, order_items=items)))
+    file.write("\n")
+
+
+def write_csv(writer, order, items):
+    """Writes one row per item, an order without items gets one row with empty item columns."""
+    order_values = list(order.values())
+    for item in items or [None]:
+        writer.writerow(order_values + (list(item.values()) if item else [None] * len(ITEM_EXPORT_FIELDS)))
+
+
+class DirectorySink:
+    """Writes part files into a local directory."""
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def open(self, name):
+        return open(os.path.join(self.path, name), "w", newline="")
+
+    def commit(self, name, file):
+        file.close()
+        return os.path.join(self.path, name)
+
+
+class S3Sink:
+    """
+    Uploads part files to S3 or an S3 compatible store (e.g. MinIO, set endpoint_url).
+    Parts are staged in a temporary file so memory stays bounded. boto3 is provided by the Lambda runtime.
+    """
+
+    def __init__(self, bucket, prefix="", endpoint_url=None):
+        import boto3  # pylint: disable=import-outside-toplevel
+
+        self.client = boto3.client("s3", endpoint_url=endpoint_url)
+        self.bucket = bucket
+        self.prefix = prefix
+
+    def open(self, name):
+        return tempfile.NamedTemporaryFile("w", newline="", suffix=f"-{name}", delete=False)
+
+    def commit(self, name, file):
+        file.close()
+        key = f"{self.prefix}{name}"
+        try:
+            self.client.upload_file(file.name, self.bucket, key)
+        finally:
+            os.remove(file.name)
+        return f"s3://{self.bucket}/{key}"
+
+
+def export_orders(
+    session,
+    sink,
+    fmt="ndjson",
+    include_deleted=False,
+    rows_per_file=DEFAULT_ROWS_PER_FILE,
+    after_id=None,
+    should_stop=None,
+):
+    """
+    Streams orders with id above after_id, up to the largest id at the start, into part files of sink.
+    Orders are read in ranges of EXPORT_BATCH_IDS ids and should_stop is called before each range, once it returns
+    True the open part is committed and the export ends, so a time limited caller can resume from last_id.
+    Parts are named after their first order id, parts of a resumed export do not overwrite earlier ones.
+    net_write_timeout of the session is raised so the cursor survives the pauses while parts are committed,
+    and reset afterwards, the connection goes back to the pool.
+
+    Returns:
+        Returns manifest with format, number of exported orders, written files, the order id exported up to
+        and whether the export is complete.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of {list(FORMATS)}")
+    session.execute(f"SET SESSION net_write_timeout = {EXPORT_NET_WRITE_TIMEOUT}")
+    try:
+        return _export_orders(session, sink, fmt, include_deleted, rows_per_file, after_id, should_stop)
+    finally:
+        session.execute("SET SESSION net_write_timeout = DEFAULT")
+
+
+def _export_orders(session, sink, fmt, include_deleted, rows_per_file, after_id, should_stop):
+    files = []
+    exported = 0
+    file = None
+    name = None
+    last_id = after_id or 0
+    max_id = session.query(func.max(Order.id)).scalar() or 0
+    while last_id < max_id and not (should_stop is not None and should_stop()):
+        up_to_id = min(last_id + EXPORT_BATCH_IDS, max_id)
+        for order, items in iter_orders(export_query(session, include_deleted, last_id, up_to_id)):
+            if file is None:
+                name = f"orders-{order['id']:010d}.{fmt}"
+                file = sink.open(name)
+                if fmt == "csv":
+                    out = csv.writer(file)
+                    out.writerow(CSV_HEADER)
+                    write = write_csv
+                else:
+                    out = file
+                    write = write_ndjson
+            write(out, order, items)
+            exported += 1
+            if exported % rows_per_file == 0:
+                files.append(sink.commit(name, file))
+                file = None
+        last_id = up_to_id
+    if file is not None:
+        files.append(sink.commit(name, file))
+    return {"format": fmt, "orders": exported, "files": files, "last_id": last_id, "complete": last_id >= max_id}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--format", choices=FORMATS, default="ndjson")
+    parser.add_argument("--all", action="store_true", help="include deleted orders")
+    parser.add_argument("--rows-per-file", type=int, default=DEFAULT_ROWS_PER_FILE)
+    parser.add_argument("--after-id", type=int, help="export orders with a greater id, resumes an earlier export")
+    parser.add_argument("--out", default="export", help="local directory for part files")
+    parser.add_argument("--s3-bucket", help="upload part files to this bucket instead of --out")
+    parser.add_argument("--s3-prefix", default="")
+    parser.add_argument("--s3-endpoint-url", help="S3 compatible endpoint, e.g. a local MinIO")
+    args = parser.parse_args(argv)
+
+    if args.s3_bucket:
+        sink = S3Sink(args.s3_bucket, args.s3_prefix, args.s3_endpoint_url)
+    else:
+        sink = DirectorySink(args.out)
+    session = create_session()
+    try:
+        manifest = export_orders(session, sink, args.format, args.all, args.rows_per_file, args.after_id)
+    finally:
+        session.close()
+    print(json.dumps(manifest, indent=2))
+
+
+if __name__ == "__main__":
+    main()
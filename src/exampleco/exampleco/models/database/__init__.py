@@ -1,9 +1,12 @@
 import logging
+import os
 
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import scoped_session, sessionmaker
+
+from .pool import TimedQueuePool
+from .querystats import install_query_stats
 
 logging.basicConfig()
 logger = logging.getLogger("exampleco.sqltime")
@@ -13,6 +16,8 @@ Base = declarative_base()
 
 session_maker = sessionmaker()
 
+_engine = None
+
 
 def get_db_config():
     return {
@@ -23,16 +28,48 @@ def get_db_config():
     }
 
 
-def get_session_maker():
-    try:
-        engine = create_engine(
+def get_pool_config():
+    """
+    Pool settings, can be overridden with environment variables.
+    A Lambda container serves one request at a time so a single pooled connection is enough.
+    Connections are recycled before MySQL wait_timeout and pinged on checkout after idle periods.
+    """
+    return {
+        "pool_size": int(os.environ.get("DB_POOL_SIZE", "1")),
+        "max_overflow": int(os.environ.get("DB_MAX_OVERFLOW", "2")),
+        "pool_timeout": float(os.environ.get("DB_POOL_TIMEOUT", "10")),
+        "pool_recycle": int(os.environ.get("DB_POOL_RECYCLE", "280")),
+        "pool_pre_ping": os.environ.get("DB_POOL_PRE_PING", "true").lower() == "true",
+    }
+
+
+def get_engine():
+    """
+    Returns the engine shared by all handlers in the process.
+    It is created on first use and does not connect until a query needs a connection.
+    Every statement is timed for the per invocation query statistics.
+    """
+    global _engine  # pylint: disable=global-statement
+    if _engine is None:
+        _engine = create_engine(
             "mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}".format(**get_db_config()),
             isolation_level="READ COMMITTED",
+            poolclass=TimedQueuePool,
+            **get_pool_config(),
         )
-        engine.connect()
-    except SQLAlchemyError as error:
-        logger.error("Error connecting to DB")
-        logger.error(error)
-    else:
-        session_maker.configure(bind=engine)
+        install_query_stats(_engine)
+    return _engine
+
+
+def create_session():
+    return session_maker(bind=get_engine())
+
+
+# Session used by handlers. A new session is created on first use in an invocation and
+# handle_exception removes it when the invocation ends, so the identity map never outlives a request.
+Session = scoped_session(create_session)
+
+
+def get_session_maker():
+    session_maker.configure(bind=get_engine())
     return session_maker
@@ -0,0 +1,115 @@
+"""
+Read-through cache of the services catalog shared by warm invocations
+"""
+import time
+
+from sqlalchemy import func
+
+from exampleco.utils.cache import LRUCache
+from .serializers import SERVICE_FIELDS, projection
+from .services import Service
+
+SERVICE_COLUMNS = projection(Service, SERVICE_FIELDS)
+
+
+class ServiceCatalog:
+    """
+    Keeps service rows (column tuples, not ORM instances) keyed by id.
+    The whole cache is dropped when the catalog version (count, max id, max modified_on) changes.
+    The version is checked at most once per revalidate_after seconds, so changes show up with that delay.
+    """
+
+    def __init__(self, maxsize=1024, revalidate_after=30, clock=time.monotonic):
+        self.services = LRUCache(maxsize)
+        self.revalidate_after = revalidate_after
+        self.clock = clock
+        self.version = None
+        self.checked_at = None
+        # True while self.services holds every row of the table
+        self.complete = False
+
+    def clear(self):
+        self.services.clear()
+        self.version = None
+        self.checked_at = None
+        self.complete = False
+
+    def revalidate(self, session):
+        now = self.clock()
+        if self.checked_at is not None and now - self.checked_at < self.revalidate_after:
+            return
+        version = tuple(
+            session.query(func.count(Service.id), func.max(Service.id), func.max(Service.modified_on)).one()
+        )
+        if version != self.version:
+            self.clear()
+            self.version = version
+        self.checked_at = now
+
+    def current_version(self, session):
+        """
+        Returns:
+            Returns catalog version (count, max id, max modified_on) as of the last revalidation.
+        """
+        self.revalidate(session)
+        return self.version
+
+    def _remember(self, service):
+        if self.services.set(service.id, service):
+            self.complete = False
+
+    def get(self, session, service_id):
+        """
+        Returns:
+            Returns service row with given id or None if it does not exist.
+        """
+        try:
+            service_id = int(service_id)
+        except (TypeError, ValueError):
+            return None
+        self.revalidate(session)
+        service = self.services.get(service_id)
+        if service is None and not self.complete:
+            service = session.query(*SERVICE_COLUMNS).filter(Service.id == service_id).first()
+            if service is not None:
+                self._remember(service)
+        return service
+
+    def get_many(self, session, service_ids):
+        """
+        Looks up several services at once, ids missing from the cache are fetched with one IN query.
+
+        Returns:
+            Returns dict of found service rows by id.
+        """
+        self.revalidate(session)
+        found = {}
+        missing = []
+        for service_id in service_ids:
+            service = self.services.get(service_id)
+            if service is not None:
+                found[service_id] = service
+            elif not self.complete:
+                missing.append(service_id)
+        if missing:
+            for service in session.query(*SERVICE_COLUMNS).filter(Service.id.in_(missing)):
+                self._remember(service)
+                found[service.id] = service
+        return found
+
+    def all(self, session):
+        """
+        Returns:
+            Returns all services ordered by id.
+        """
+        self.revalidate(session)
+        if self.complete:
+            return sorted(self.services.values(), key=lambda service: service.id)
+        services = session.query(*SERVICE_COLUMNS).order_by(Service.id).all()
+        for service in services:
+            self._remember(service)
+        self.complete = len(services) <= self.services.maxsize
+        return services
+
+
+service_catalog = ServiceCatalog()
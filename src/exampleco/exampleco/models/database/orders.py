@@ -1,8 +1,6 @@
 import enum
 
-from marshmallow import fields
-from marshmallow_sqlalchemy import SQLAlchemySchema
-from sqlalchemy import Column, Integer, String, text, TIMESTAMP, ForeignKey, Enum
+from sqlalchemy import Column, Integer, Index, Numeric, String, text, TIMESTAMP, ForeignKey, Enum
 from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship
 
@@ -17,6 +15,14 @@ class OrderStatuses(enum.Enum):
 
 class Order(Base):
     __tablename__ = "orders"
+    __table_args__ = (
+        Index("ix_orders_status_created_on_id", "status", "created_on", "id"),
+        Index("ix_orders_created_on", "created_on"),
+        Index("ix_orders_modified_on_id", "modified_on", "id"),
+        Index("ix_orders_status_service_id_created_on_id", "status", "service_id", "created_on", "id"),
+        Index("ix_orders_status_name_id", "status", "name", "id"),
+        Index("ix_orders_status_service_id_name_id", "status", "service_id", "name", "id"),
+    )
 
     id = Column(Integer, primary_key=True)
     name = Column(String(128), nullable=False)
@@ -30,12 +36,15 @@ class Order(Base):
         server_default=OrderStatuses.ACTIVE.value,
         nullable=False,
     )
+    # sum of the item price snapshots, maintained when items are inserted so reads need no aggregation
+    total = Column(Numeric(12, 2), nullable=False, default=0, server_default=text("0"))
 
     created_on = Column(TIMESTAMP, nullable=False, server_default=text("CURRENT_TIMESTAMP"))
+    # bumped by MySQL on every change, including bulk UPDATEs, the change feed relies on it
     modified_on = Column(
         TIMESTAMP,
         nullable=False,
-        server_default=text("CURRENT_TIMESTAMP"),
+        server_default=text("CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP"),
         server_onupdate=text("CURRENT_TIMESTAMP"),
     )
 
@@ -64,6 +73,9 @@ class OrderItem(Base):
 
     order_id = Column(Integer, ForeignKey("orders.id"), nullable=False)
     order = relationship("Order", back_populates="order_items")
+    service_id = Column(Integer, ForeignKey("services.id"), nullable=False)
+    # Service.price rounded to cents when the item was created, later price changes do not affect existing orders
+    price = Column(Numeric(12, 2), nullable=False)
     created_on = Column(TIMESTAMP, nullable=False, server_default=text("CURRENT_TIMESTAMP"))
     modified_on = Column(
         TIMESTAMP,
@@ -73,37 +85,6 @@ class OrderItem(Base):
     )
 
     def __repr__(self) -> str:
-        return "<OrderItem(name='{}', order_id='{}', created_on='{}')>".format(
-            self.name, self.order_id, self.created_on
+        return "<OrderItem(name='{}', order_id='{}', price='{}', created_on='{}')>".format(
+            self.name, self.order_id, self.price, self.created_on
         )
-
-
-class OrderItemSchema(SQLAlchemySchema):
-    id = fields.Integer()
-    name = fields.String(required=True)
-    order_id = fields.Integer(required=True)
-    created_on = fields.DateTime()
-    modified_on = fields.DateTime()
-
-    class Meta:
-        model = OrderItem
-        load_instance = True
-
-
-class OrderSchemaList(SQLAlchemySchema):
-    id = fields.Integer()
-    name = fields.String(required=True)
-    service_id = fields.Integer(required=True)
-    created_on = fields.DateTime()
-    modified_on = fields.DateTime()
-
-    class Meta:
-        model = Order
-        load_instance = True
-
-
-class OrderSchemaDetail(OrderSchemaList):
-    order_items = fields.Nested(OrderItemSchema, many=True)
-
-    class Meta(OrderSchemaList.Meta):
-        pass
@@ -0,0 +1,57 @@
+"""
+Connection pool with checkout wait time metrics
+"""
+import logging
+import threading
+import time
+
+from sqlalchemy.pool import QueuePool
+
+logger = logging.getLogger("exampleco.sqltime")
+
+SLOW_CHECKOUT_SECONDS = 0.1
+
+
+class PoolMetrics:
+    """Aggregated time spent waiting for a connection from the pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.total_wait = 0.0
+            self.max_wait = 0.0
+
+    def record(self, wait):
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "total_wait_ms": round(self.total_wait * 1000, 3),
+                "max_wait_ms": round(self.max_wait * 1000, 3),
+            }
+
+
+pool_metrics = PoolMetrics()
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that reports how long every checkout waited, including opening new connections."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            wait = time.perf_counter() - start
+            pool_metrics.record(wait)
+            if wait > SLOW_CHECKOUT_SECONDS:
+                logger.warning("Slow connection checkout: %.1f ms, %s", wait * 1000, self.status())
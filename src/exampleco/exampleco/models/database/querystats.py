@@ -0,0 +1,110 @@
+"""
+Per invocation SQL statistics collected from engine events
+"""
+import logging
+import os
+import threading
+import time
+from collections import Counter
+
+from sqlalchemy import event
+
+logger = logging.getLogger("exampleco.sqltime")
+
+# statements slower than this are logged on their own and flagged in the invocation summary
+SLOW_QUERY_SECONDS = float(os.environ.get("DB_SLOW_QUERY_MS", "100")) / 1000
+# the same statement text executed this many times in one invocation is most likely an N+1 pattern
+REPEATED_QUERY_THRESHOLD = int(os.environ.get("DB_REPEATED_QUERY_THRESHOLD", "5"))
+# statements are shortened to this many characters in log lines
+STATEMENT_LOG_LENGTH = 300
+
+
+def _shorten(statement):
+    return " ".join(statement.split())[:STATEMENT_LOG_LENGTH]
+
+
+class QueryStats:
+    """
+    Counts statements and their time between start and finish of an invocation.
+    State is thread local, so handlers invoked concurrently in one process (e.g. by load tests) do not mix.
+    Nothing is recorded outside of an invocation.
+    """
+
+    def __init__(self, slow_query_seconds=SLOW_QUERY_SECONDS, repeated_query_threshold=REPEATED_QUERY_THRESHOLD):
+        self.slow_query_seconds = slow_query_seconds
+        self.repeated_query_threshold = repeated_query_threshold
+        self._local = threading.local()
+
+    def start(self):
+        local = self._local
+        local.active = True
+        local.queries = 0
+        local.total = 0.0
+        local.slowest = 0.0
+        local.slowest_statement = None
+        local.slow_queries = 0
+        local.statements = Counter()
+
+    @property
+    def active(self):
+        return getattr(self._local, "active", False)
+
+    def record(self, statement, duration):
+        if not self.active:
+            return
+        local = self._local
+        local.queries += 1
+        local.total += duration
+        local.statements[statement] += 1
+        if duration > local.slowest:
+            local.slowest = duration
+            local.slowest_statement = statement
+        if duration > self.slow_query_seconds:
+            local.slow_queries += 1
+            logger.warning("Slow query: %.1f ms, %s", duration * 1000, _shorten(statement))
+
+    def finish(self):
+        """
+        Stops recording for the current thread.
+
+        Returns:
+            Returns dict with query count, total and slowest statement time and statements repeated
+            at least repeated_query_threshold times.
+        """
+        if not self.active:
+            return {}
+        local = self._local
+        local.active = False
+        repeated = [
+            {"statement": _shorten(statement), "count": count}
+            for statement, count in local.statements.most_common()
+            if count >= self.repeated_query_threshold
+        ]
+        return {
+            "queries": local.queries,
+            "db_time_ms": round(local.total * 1000, 3),
+            "slowest_ms": round(local.slowest * 1000, 3),
+            "slowest_statement": _shorten(local.slowest_statement) if local.slowest_statement else None,
+            "slow_queries": local.slow_queries,
+            "repeated_queries": repeated,
+        }
+
+
+query_stats = QueryStats()
+
+
+# pylint: disable=unused-argument
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info["query_start"] = time.perf_counter()
+
+
+# pylint: disable=unused-argument
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - conn.info["query_start"]
+    query_stats.record(statement, duration)
+
+
+def install_query_stats(engine):
+    """Times every statement executed through the engine."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
@@ -0,0 +1,59 @@
+"""
+Marshmallow schemas of the models.
+Kept apart from the models because importing marshmallow is a large share of a handler cold start.
+"""
+from marshmallow import fields
+from marshmallow_sqlalchemy import SQLAlchemySchema
+
+from .orders import Order, OrderItem
+from .services import Service
+
+
+class ServiceSchema(SQLAlchemySchema):
+    class Meta:
+        model = Service
+        load_instance = True
+        ordered = True
+
+    id = fields.Integer()
+    name = fields.String(required=True)
+    description = fields.String()
+    price = fields.Float(required=True)
+    created_on = fields.DateTime()
+    modified_on = fields.DateTime()
+
+
+class OrderItemSchema(SQLAlchemySchema):
+    id = fields.Integer()
+    name = fields.String(required=True)
+    order_id = fields.Integer(required=True)
+    service_id = fields.Integer(required=True)
+    price = fields.Float(required=True)
+    created_on = fields.DateTime()
+    modified_on = fields.DateTime()
+
+    class Meta:
+        model = OrderItem
+        load_instance = True
+        ordered = True
+
+
+class OrderSchemaList(SQLAlchemySchema):
+    id = fields.Integer()
+    name = fields.String(required=True)
+    service_id = fields.Integer(required=True)
+    total = fields.Float()
+    created_on = fields.DateTime()
+    modified_on = fields.DateTime()
+
+    class Meta:
+        model = Order
+        load_instance = True
+        ordered = True
+
+
+class OrderSchemaDetail(OrderSchemaList):
+    order_items = fields.Nested(OrderItemSchema, many=True)
+
+    class Meta(OrderSchemaList.Meta):
+        pass
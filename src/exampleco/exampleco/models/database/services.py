@@ -1,8 +1,6 @@
 """
 A place for Services related models
 """
-from marshmallow import fields
-from marshmallow_sqlalchemy import SQLAlchemySchema
 from sqlalchemy import Column, Float, Integer, String, text, TEXT, TIMESTAMP
 
 from . import Base
@@ -18,25 +16,13 @@ class Service(Base):
     description = Column(TEXT, nullable=True)
     price = Column(Float, nullable=False)
     created_on = Column(TIMESTAMP, nullable=False, server_default=text("CURRENT_TIMESTAMP"))
+    # bumped by MySQL on every change, ServiceCatalog relies on it to revalidate the cache
     modified_on = Column(
         TIMESTAMP,
         nullable=False,
-        server_default=text("CURRENT_TIMESTAMP"),
+        server_default=text("CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP"),
         server_onupdate=text("CURRENT_TIMESTAMP"),
     )
 
     def __repr__(self) -> str:
         return "<Service(name='{}', price='{}', created_on='{}')>".format(self.name, self.price, self.created_on)
-
-
-class ServiceSchema(SQLAlchemySchema):
-    class Meta:
-        model = Service
-        load_instance = True
-
-    id = fields.Integer()
-    name = fields.String(required=True)
-    description = fields.String()
-    price = fields.Float(required=True)
-    created_on = fields.DateTime()
-    modified_on = fields.DateTime()
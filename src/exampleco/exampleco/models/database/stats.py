@@ -0,0 +1,67 @@
+"""
+A place for pre-aggregated order statistics
+"""
+from sqlalchemy import Column, DateTime, Integer, func, select, text
+from sqlalchemy.dialects.mysql import insert
+
+from . import Base
+from .orders import Order
+
+
+class OrderStatsHourly(Base):
+    """Number of orders created per hour. Keeps stats queries independent of the orders table size."""
+
+    __tablename__ = "order_stats_hourly"
+
+    bucket = Column(DateTime, primary_key=True)
+    orders_count = Column(Integer, nullable=False, default=0, server_default=text("0"))
+
+    def __repr__(self) -> str:
+        return "<OrderStatsHourly(bucket='{}', orders_count='{}')>".format(self.bucket, self.orders_count)
+
+
+def hour_bucket(column):
+    return func.date_format(column, "%Y-%m-%d %H:00:00")
+
+
+def count_by_hour(condition):
+    """Counts orders matching condition per hour. Range conditions on created_on use ix_orders_created_on."""
+    bucket = hour_bucket(Order.created_on)
+    return select([bucket, func.count(Order.id)]).where(condition).group_by(bucket)
+
+
+def _upsert_counts(condition):
+    stmt = insert(OrderStatsHourly).from_select(["bucket", "orders_count"], count_by_hour(condition))
+    return stmt.on_duplicate_key_update(orders_count=OrderStatsHourly.orders_count + stmt.inserted.orders_count)
+
+
+def record_created_orders(session, order_ids):
+    """
+    Adds freshly inserted orders to the hourly rollup.
+    Must be called after flush and before commit so the counters change in the same transaction as the orders.
+    """
+    session.execute(_upsert_counts(Order.id.in_(order_ids)))
+
+
+def rebuild_hourly_stats(session, since):
+    """
+    Recomputes rollup rows from raw orders starting with the hour that contains since.
+    Used to backfill and to repair counters.
+    """
+    start = since.replace(minute=0, second=0, microsecond=0)
+    session.query(OrderStatsHourly).filter(OrderStatsHourly.bucket >= start).delete(synchronize_session=False)
+    session.execute(_upsert_counts(Order.created_on >= start))
+
+
+def hourly_counts(session, since):
+    """
+    Returns:
+        Returns (bucket, orders_count) rows for every hour starting with the hour that contains since.
+    """
+    start = since.replace(minute=0, second=0, microsecond=0)
+    return (
+        session.query(OrderStatsHourly.bucket, OrderStatsHourly.orders_count)
+        .filter(OrderStatsHourly.bucket >= start)
+        .order_by(OrderStatsHourly.bucket)
+        .all()
+    )
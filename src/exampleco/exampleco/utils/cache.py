@@ -0,0 +1,115 @@
+"""
+A place for caches that survive between warm Lambda invocations
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class LocalBackend:
+    """
+    Dict based cache backend local to the container, holding at most max_entries entries.
+    Any object with the same get/set/delete/delete_prefix methods (e.g. a Redis client wrapper using SCAN MATCH)
+    can be used instead to share entries between containers.
+    """
+
+    max_entries = 1024
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= self.clock():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            now = self.clock()
+            if key not in self._data and len(self._data) >= self.max_entries:
+                self._data = {k: entry for k, entry in self._data.items() if entry[0] > now}
+                if len(self._data) >= self.max_entries:
+                    # nothing expired yet, drop the entry that would expire first
+                    del self._data[min(self._data, key=lambda k: self._data[k][0])]
+            self._data[key] = (now + ttl, value)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def delete_prefix(self, prefix):
+        with self._lock:
+            self._data = {k: entry for k, entry in self._data.items() if not k.startswith(prefix)}
+
+
+class TTLCache:
+    """Namespaced cache with a fixed time to live on top of a swappable backend."""
+
+    def __init__(self, namespace, ttl, backend=None):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.backend = backend if backend is not None else LocalBackend()
+
+    def _key(self, key):
+        return f"{self.namespace}:{key}"
+
+    def get(self, key):
+        return self.backend.get(self._key(key))
+
+    def set(self, key, value):
+        self.backend.set(self._key(key), value, self.ttl)
+
+    def delete(self, key):
+        self.backend.delete(self._key(key))
+
+    def clear(self):
+        """Deletes the entries of this namespace only, other caches may share the backend."""
+        self.backend.delete_prefix(self._key(""))
+
+
+class LRUCache:
+    """Bounded mapping that evicts the least recently used entry."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        """
+        Returns:
+            Returns True if an entry had to be evicted to make room.
+        """
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                return True
+            return False
+
+    def values(self):
+        with self._lock:
+            return list(self._data.values())
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
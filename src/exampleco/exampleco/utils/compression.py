@@ -0,0 +1,72 @@
+"""
+Content negotiation and compression of Lambda proxy response bodies.
+Brotli is a declared dependency (requirements.txt), when it is missing anyway only gzip is offered.
+"""
+import base64
+import gzip
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# bodies below this size are sent as is, the base64 overhead and CPU time are not worth it
+MIN_COMPRESS_SIZE = 1024
+# levels picked with benchmarks.bench_compression, higher ones cost a lot of CPU for a few percent of bytes
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def _gzip(data):
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def _brotli(data):
+    return brotli.compress(data, quality=BROTLI_QUALITY)
+
+
+# encodings in server preference order
+ENCODINGS = {"gzip": _gzip} if brotli is None else {"br": _brotli, "gzip": _gzip}
+
+
+def _accepted_encodings(accept_encoding):
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name.strip().lower()] = quality
+    return accepted
+
+
+def choose_encoding(accept_encoding):
+    """
+    Picks the encoding with the highest q-value from Accept-Encoding, ties go to ENCODINGS order.
+
+    Returns:
+        Returns encoding name or None if the body should be sent uncompressed.
+    """
+    if not accept_encoding:
+        return None
+    accepted = _accepted_encodings(accept_encoding)
+    best = None
+    best_quality = 0.0
+    for name in ENCODINGS:
+        quality = accepted.get(name, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = name, quality
+    return best
+
+
+def compress_body(body, encoding):
+    """
+    Returns:
+        Returns body compressed with given encoding and base64 encoded as Lambda proxy integration expects.
+    """
+    return base64.b64encode(ENCODINGS[encoding](body.encode())).decode()
@@ -0,0 +1,104 @@
+"""
+Helpers for conditional GET requests (ETag / If-None-Match and Last-Modified / If-Modified-Since)
+"""
+import datetime
+import hashlib
+import json
+from email.utils import format_datetime, parsedate_to_datetime
+
+
+def make_etag(*parts):
+    """
+    Builds a strong ETag from values identifying a representation, e.g. id and modified_on or a response body.
+
+    Returns:
+        Returns quoted ETag string.
+    """
+    raw = json.dumps(parts, separators=(",", ":"), default=str)
+    return '"{}"'.format(hashlib.blake2b(raw.encode(), digest_size=16).hexdigest())
+
+
+def make_version_etag(*parts):
+    """
+    Builds a weak ETag from a row version, e.g. id and modified_on. TIMESTAMP columns have one second precision,
+    so a client that read between two writes in the same second keeps a matching ETag until the next write.
+    Weak marks the representation as equivalent rather than identical, use make_etag of the body where that matters.
+
+    Returns:
+        Returns weak ETag string.
+    """
+    return "W/" + make_etag(*parts)
+
+
+def _as_utc(value):
+    # naive database timestamps are taken as UTC, the time zone Lambda and MySQL on RDS run in
+    if value.tzinfo is None:
+        return value.replace(tzinfo=datetime.timezone.utc)
+    return value.astimezone(datetime.timezone.utc)
+
+
+def http_date(value):
+    return format_datetime(_as_utc(value).replace(microsecond=0), usegmt=True)
+
+
+def get_header(event, name):
+    """API Gateway lowercases header names of HTTP APIs, other callers may not."""
+    headers = event.get("headers") or {}
+    for key, value in headers.items():
+        if key.lower() == name:
+            return value
+    return None
+
+
+def is_conditional(event):
+    """
+    Returns:
+        Returns True if the request carries a validator, handlers only pay for version lookups in that case.
+    """
+    return get_header(event, "if-none-match") is not None or get_header(event, "if-modified-since") is not None
+
+
+def _strip_weak(etag):
+    etag = etag.strip()
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def is_not_modified(event, etag, last_modified=None):
+    """
+    Evaluates If-None-Match and, only when it is absent, If-Modified-Since against the current representation.
+
+    Returns:
+        Returns True if the client copy is still fresh and 304 can be returned.
+    """
+    if_none_match = get_header(event, "if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        return _strip_weak(etag) in {_strip_weak(tag) for tag in if_none_match.split(",")}
+    if_modified_since = get_header(event, "if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = _as_utc(parsedate_to_datetime(if_modified_since))
+    except (TypeError, ValueError):
+        return False
+    return _as_utc(last_modified).replace(microsecond=0) <= since
+
+
+def cache_headers(etag, last_modified=None):
+    """
+    Returns:
+        Returns validator headers to send with both 200 and 304 responses.
+    """
+    headers = {"ETag": etag}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
+
+
+def not_modified(etag, last_modified=None):
+    """
+    Returns:
+        Returns 304 response without body.
+    """
+    return {"statusCode": 304, "headers": cache_headers(etag, last_modified)}
@@ -3,23 +3,86 @@ A place for custom decorators
 """
 import json
 import logging
+import time
 
 from functools import wraps
 
+from exampleco.models.database import Session
+from exampleco.models.database.querystats import query_stats
+from exampleco.utils.compression import MIN_COMPRESS_SIZE, choose_encoding, compress_body
+from exampleco.utils.conditional import get_header
+from exampleco.utils.profiling import phase
+
 logging.basicConfig()
 logger = logging.getLogger("exampleco.sqltime")
 logger.setLevel(logging.DEBUG)
 
 
+def log_invocation(handler, status, duration, stats):
+    """
+    Emits one JSON log line per invocation with its SQL statistics.
+    Logged as a warning when the invocation ran slow or repeated statements.
+    """
+    line = {"handler": handler, "status": status, "duration_ms": round(duration * 1000, 3), **stats}
+    suspicious = stats.get("slow_queries") or stats.get("repeated_queries")
+    logger.log(logging.WARNING if suspicious else logging.INFO, json.dumps(line))
+
+
 def handle_exception(func):
-    """Catches all unexpected exceptions and returns 500 response."""
+    """
+    Catches all unexpected exceptions and returns 500 response.
+    Removes the invocation's Session afterwards, uncommitted changes are rolled back.
+    Statements executed by the invocation are counted and timed, see log_invocation.
+    """
 
     @wraps(func)
     def inner(*args, **kwargs):
+        query_stats.start()
+        start = time.perf_counter()
+        status = 500
         try:
-            return func(*args, **kwargs)
+            response = func(*args, **kwargs)
+            status = response.get("statusCode")
+            return response
         except Exception as exc:  # pylint: disable=broad-except
             logger.error("Exception occurred: %s", exc)
             return {"statusCode": 500, "body": json.dumps({"error": str(exc)})}
+        finally:
+            Session.remove()
+            log_invocation(func.__name__, status, time.perf_counter() - start, query_stats.finish())
+
+    return inner
+
+
+def compress_response(func=None, min_size=MIN_COMPRESS_SIZE):
+    """
+    Compresses response bodies of at least min_size characters with the best encoding from Accept-Encoding.
+    The body is returned base64 encoded with isBase64Encoded set, as Lambda proxy integration expects.
+    Vary and the weakened ETag are set whenever an encoding is negotiated, whatever the body size,
+    so 304 responses (which carry no body) send the same validators as the 200 they stand for.
+    Meant to be applied under handle_exception, so a failure here still ends up as 500 response.
+    """
+    if func is None:
+        return lambda wrapped: compress_response(wrapped, min_size)
+
+    @wraps(func)
+    def inner(event, context):
+        response = func(event, context)
+        body = response.get("body")
+        not_modified = response.get("statusCode") == 304
+        if not not_modified and (not isinstance(body, str) or response.get("isBase64Encoded")):
+            return response
+        headers = dict(response.get("headers") or {})
+        headers["Vary"] = "Accept-Encoding"
+        encoding = choose_encoding(get_header(event, "accept-encoding"))
+        if encoding is not None:
+            # the encoded bytes differ from the identity representation, so only a weak validator still holds
+            if headers.get("ETag", "").startswith('"'):
+                headers["ETag"] = "W/" + headers["ETag"]
+            if not not_modified and len(body) >= min_size:
+                headers["Content-Encoding"] = encoding
+                with phase("encode"):
+                    response = {**response, "body": compress_body(body, encoding), "isBase64Encoded": True}
+        return {**response, "headers": headers}
 
     return inner
@@ -0,0 +1,64 @@
+"""
+Helpers for keyset (cursor based) pagination
+"""
+import base64
+import binascii
+import datetime
+import json
+
+
+def parse_datetime(value):
+    return datetime.datetime.fromisoformat(value)
+
+
+def _to_json(value):
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    return value
+
+
+def encode_cursor(values):
+    """
+    Builds an opaque cursor token from the sort key values of the last returned row.
+
+    Returns:
+        Returns url safe base64 string without padding.
+    """
+    raw = json.dumps([_to_json(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token, types):
+    """
+    Reverses encode_cursor. Every decoded value is passed through the matching callable from types.
+
+    Returns:
+        Returns a tuple of sort key values or raises ValueError if the token is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError
+        return tuple(convert(value) for convert, value in zip(types, values))
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as exc:
+        raise ValueError("cursor is invalid.") from exc
+
+
+def parse_limit(value, default, maximum, name="limit"):
+    """
+    Validates limit like parameters.
+
+    Returns:
+        Returns default if value is empty, raises ValueError if it is not an integer in [1, maximum].
+    """
+    if value in (None, ""):
+        return default
+    error = f"{name} must be an integer between 1 and {maximum}."
+    try:
+        limit = int(value)
+    except (TypeError, ValueError) as exc:
+        raise ValueError(error) from exc
+    if not 1 <= limit <= maximum:
+        raise ValueError(error)
+    return limit
@@ -0,0 +1,240 @@
+"""
+Latency instrumentation for handlers: wall and CPU time, named phases, sampled cProfile dumps of slow
+invocations and per handler latencies shipped as CloudWatch Embedded Metric Format (EMF) log lines.
+"""
+import bisect
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from functools import wraps
+
+logger = logging.getLogger("exampleco.sqltime")
+
+# share of invocations run under cProfile, profiles are only kept when the invocation is slow
+PROFILE_SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", "0"))
+SLOW_INVOCATION_MS = float(os.environ.get("SLOW_INVOCATION_MS", "1000"))
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "/tmp/profiles")
+PROFILE_LOG_LINES = 25
+METRICS_NAMESPACE = os.environ.get("METRICS_NAMESPACE", "exampleco")
+# 0 writes the EMF lines of every invocation before it returns, a frozen or reclaimed Lambda container
+# loses anything still buffered, only long-lived processes like the load test should batch
+METRICS_FLUSH_SECONDS = float(os.environ.get("METRICS_FLUSH_SECONDS", "0"))
+
+# histogram bucket upper bounds in ms, 15% apart from 0.5 ms to 60 s
+BUCKET_BOUNDS = [round(0.5 * 1.15**i, 3) for i in range(84)] + [60000.0]
+# an EMF metric value is a number or an array of at most 100 numbers
+MAX_EMF_VALUES = 100
+
+
+class Histogram:
+    """Log bucketed latency histogram, percentiles are exact to one bucket (15%)."""
+
+    def __init__(self):
+        self.counts = Counter()
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def record(self, value):
+        self.counts[min(bisect.bisect_left(BUCKET_BOUNDS, value), len(BUCKET_BOUNDS) - 1)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, quantile):
+        """
+        Returns:
+            Returns upper bound of the bucket holding the given quantile (capped by max) or None if empty.
+        """
+        if not self.count:
+            return None
+        rank = quantile * self.count
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return round(min(BUCKET_BOUNDS[index], self.max), 3)
+        return round(self.max, 3)
+
+
+class LatencyMetrics:
+    """
+    Latencies of wall time, CPU time and phases per handler.
+    Histograms serve snapshot(), the recorded values are written to stdout as EMF lines of at most
+    MAX_EMF_VALUES values per metric, stamped with the minute they were recorded in. Both are reset on
+    every flush, or at most once per flush_interval seconds when batching, CloudWatch then serves
+    p50/p95/p99 of every metric and handler from the values.
+    """
+
+    def __init__(
+        self, namespace=METRICS_NAMESPACE, flush_interval=METRICS_FLUSH_SECONDS, clock=time.monotonic, now=time.time
+    ):
+        self.namespace = namespace
+        self.flush_interval = flush_interval
+        self.clock = clock
+        self.now = now
+        self._histograms = {}
+        self._values = {}
+        self._lock = threading.Lock()
+        self._flushed_at = clock()
+
+    def record(self, handler, values):
+        timestamp = int(self.now() * 1000)
+        with self._lock:
+            histograms = self._histograms.setdefault(handler, {})
+            # one series per handler and minute, stamped with its first value
+            batch = self._values.setdefault((handler, timestamp // 60000), {"timestamp": timestamp, "metrics": {}})
+            recorded = batch["metrics"]
+            for name, value in values.items():
+                histograms.setdefault(name, Histogram()).record(value)
+                recorded.setdefault(name, []).append(round(value, 3))
+
+    def snapshot(self):
+        """
+        Returns:
+            Returns {handler: {metric: {"count", "p50", "p95", "p99"}}} since the last flush.
+        """
+        with self._lock:
+            return {
+                handler: {
+                    name: {
+                        "count": histogram.count,
+                        "p50": histogram.percentile(0.5),
+                        "p95": histogram.percentile(0.95),
+                        "p99": histogram.percentile(0.99),
+                    }
+                    for name, histogram in histograms.items()
+                }
+                for handler, histograms in self._histograms.items()
+            }
+
+    def emf(self):
+        """
+        Returns:
+            Returns EMF documents with the values recorded since the last flush and resets the metrics.
+            Every metric member is an array of at most MAX_EMF_VALUES numbers, longer series span several documents.
+        """
+        with self._lock:
+            recorded, self._values = self._values, {}
+            self._histograms = {}
+            self._flushed_at = self.clock()
+        documents = []
+        for (handler, _), batch in recorded.items():
+            metrics = batch["metrics"]
+            longest = max((len(values) for values in metrics.values()), default=0)
+            for start in range(0, longest, MAX_EMF_VALUES):
+                chunk = {
+                    name: values[start : start + MAX_EMF_VALUES]
+                    for name, values in metrics.items()
+                    if len(values) > start
+                }
+                documents.append(
+                    {
+                        "_aws": {
+                            "Timestamp": batch["timestamp"],
+                            "CloudWatchMetrics": [
+                                {
+                                    "Namespace": self.namespace,
+                                    "Dimensions": [["handler"]],
+                                    "Metrics": [{"Name": name, "Unit": "Milliseconds"} for name in chunk],
+                                }
+                            ],
+                        },
+                        "handler": handler,
+                        **chunk,
+                    }
+                )
+        return documents
+
+    def flush(self, force=False, stream=None):
+        if not force and self.clock() - self._flushed_at < self.flush_interval:
+            return
+        stream = stream or sys.stdout
+        # EMF lines have to be plain JSON, the Lambda logging handler would prefix them
+        for document in self.emf():
+            stream.write(json.dumps(document) + "\n")
+        stream.flush()
+
+
+latency_metrics = LatencyMetrics()
+_local = threading.local()
+
+
+@contextmanager
+def phase(name):
+    """Adds the time spent in the block to the named phase of the current invocation, if one is instrumented."""
+    phases = getattr(_local, "phases", None)
+    if phases is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        phases[name] = phases.get(name, 0.0) + time.perf_counter() - start
+
+
+def _start_profile():
+    if PROFILE_SAMPLE_RATE <= 0 or random.random() >= PROFILE_SAMPLE_RATE:
+        return None
+    profile = cProfile.Profile()
+    try:
+        profile.enable()
+    except ValueError:
+        # another profiler is active in this thread or process
+        return None
+    return profile
+
+
+def _dump_profile(profile, handler, wall_ms):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    path = os.path.join(PROFILE_DIR, f"{handler}-{int(time.time() * 1000)}.prof")
+    profile.dump_stats(path)
+    summary = io.StringIO()
+    pstats.Stats(profile, stream=summary).sort_stats("cumulative").print_stats(PROFILE_LOG_LINES)
+    logger.warning(
+        "Slow invocation of %s: %.1f ms, profile saved to %s\n%s", handler, wall_ms, path, summary.getvalue()
+    )
+
+
+def instrument(func):
+    """
+    Records wall time, CPU time and the time of phases marked with phase() for every invocation
+    into latency_metrics. A PROFILE_SAMPLE_RATE share of invocations runs under cProfile and the profile
+    is dumped when the invocation takes longer than SLOW_INVOCATION_MS.
+    Meant to be applied under handle_exception, so the measured time excludes session cleanup and logging.
+    """
+
+    @wraps(func)
+    def inner(event, context):
+        _local.phases = {}
+        profile = _start_profile()
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            return func(event, context)
+        finally:
+            wall_ms = (time.perf_counter() - wall_start) * 1000
+            cpu_ms = (time.thread_time() - cpu_start) * 1000
+            if profile is not None:
+                profile.disable()
+                if wall_ms > SLOW_INVOCATION_MS:
+                    _dump_profile(profile, func.__name__, wall_ms)
+            values = {"wall_ms": wall_ms, "cpu_ms": cpu_ms}
+            values.update((f"{name}_ms", seconds * 1000) for name, seconds in _local.phases.items())
+            _local.phases = None
+            latency_metrics.record(func.__name__, values)
+            latency_metrics.flush()
+
+    return inner
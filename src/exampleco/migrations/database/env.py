@@ -8,6 +8,7 @@ from alembic import context
 
 from exampleco.models.database.services import Service
 from exampleco.models.database.orders import Order, OrderItem
+from exampleco.models.database.stats import OrderStatsHourly
 from exampleco.models.database import Base
 
 # this is the Alembic Config object, which provides
@@ -0,0 +1,32 @@
+# pylint: skip-file
+"""Bump orders.modified_on on update and index it for the change feed
+
+The index is built with online DDL so it can be applied while the table takes writes.
+
+Revision ID: 320d5e6ea3f6
+Revises: c69c0da6ab7d
+Create Date: 2026-10-18 15:07:19.482305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "320d5e6ea3f6"
+down_revision = "c69c0da6ab7d"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(
+        "ALTER TABLE orders MODIFY modified_on TIMESTAMP NOT NULL "
+        "DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP"
+    )
+    op.execute("ALTER TABLE orders ADD INDEX ix_orders_modified_on_id (modified_on, id), ALGORITHM=INPLACE, LOCK=NONE")
+
+
+def downgrade():
+    op.execute("ALTER TABLE orders DROP INDEX ix_orders_modified_on_id, ALGORITHM=INPLACE, LOCK=NONE")
+    op.execute("ALTER TABLE orders MODIFY modified_on TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP")
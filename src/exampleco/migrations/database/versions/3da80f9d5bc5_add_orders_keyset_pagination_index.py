@@ -0,0 +1,25 @@
+# pylint: skip-file
+"""Add orders keyset pagination index
+
+Revision ID: 3da80f9d5bc5
+Revises: d07197aab83d
+Create Date: 2026-10-18 11:40:12.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "3da80f9d5bc5"
+down_revision = "d07197aab83d"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("ix_orders_status_created_on_id", "orders", ["status", "created_on", "id"])
+
+
+def downgrade():
+    op.drop_index("ix_orders_status_created_on_id", table_name="orders")
@@ -0,0 +1,39 @@
+# pylint: skip-file
+"""Add orders list filter and sort indexes
+
+Built with online DDL so they can be applied while the table takes writes.
+
+Revision ID: 92f260a7e1ce
+Revises: 320d5e6ea3f6
+Create Date: 2026-10-18 16:21:43.905117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "92f260a7e1ce"
+down_revision = "320d5e6ea3f6"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(
+        "ALTER TABLE orders "
+        "ADD INDEX ix_orders_status_service_id_created_on_id (status, service_id, created_on, id), "
+        "ADD INDEX ix_orders_status_name_id (status, name, id), "
+        "ADD INDEX ix_orders_status_service_id_name_id (status, service_id, name, id), "
+        "ALGORITHM=INPLACE, LOCK=NONE"
+    )
+
+
+def downgrade():
+    op.execute(
+        "ALTER TABLE orders "
+        "DROP INDEX ix_orders_status_service_id_created_on_id, "
+        "DROP INDEX ix_orders_status_name_id, "
+        "DROP INDEX ix_orders_status_service_id_name_id, "
+        "ALGORITHM=INPLACE, LOCK=NONE"
+    )
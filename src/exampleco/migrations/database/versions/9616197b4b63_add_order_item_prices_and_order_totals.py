@@ -0,0 +1,71 @@
+# pylint: skip-file
+"""Add service and price snapshot to order items and totals to orders
+
+Columns are added with online DDL and stay nullable until ae1a00be2d84, which runs once the code writing
+snapshots is deployed. Existing items are backfilled in id-range chunks, each committed on its own so row
+locks are held for one chunk only, with the service of their order at its current price, the only price known.
+Prices are stored as DECIMAL, the FLOAT services.price is rounded to cents by CAST.
+The totals backfill keeps modified_on as is, so the change feed does not replay every order.
+ae1a00be2d84 repeats the backfill with its own copy of the statements, migrations are kept self-contained.
+
+Revision ID: 9616197b4b63
+Revises: 92f260a7e1ce
+Create Date: 2026-10-18 18:42:05.317264
+
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "9616197b4b63"
+down_revision = "92f260a7e1ce"
+branch_labels = None
+depends_on = None
+
+BACKFILL_CHUNK_SIZE = 10000
+
+BACKFILL_ITEMS = sa.text(
+    "UPDATE order_items "
+    "JOIN orders ON orders.id = order_items.order_id "
+    "JOIN services ON services.id = orders.service_id "
+    "SET order_items.service_id = orders.service_id, order_items.price = CAST(services.price AS DECIMAL(12, 2)) "
+    "WHERE order_items.id BETWEEN :first AND :last AND order_items.price IS NULL"
+)
+BACKFILL_TOTALS = sa.text(
+    "UPDATE orders "
+    "JOIN (SELECT order_id, SUM(price) AS total FROM order_items "
+    "WHERE order_id BETWEEN :first AND :last GROUP BY order_id) AS totals ON totals.order_id = orders.id "
+    "SET orders.total = totals.total, orders.modified_on = orders.modified_on "
+    "WHERE orders.total <> totals.total"
+)
+
+
+def backfill(statement, table):
+    """Runs statement over id ranges of table, alembic keeps one transaction per migration so chunks commit here."""
+    if context.is_offline_mode():
+        # no connection to read MAX(id) from, the generated script covers every id in one statement
+        op.execute(statement.bindparams(first=1, last=2**31 - 1))
+        return
+    connection = op.get_bind()
+    last_id = connection.execute(sa.text(f"SELECT COALESCE(MAX(id), 0) FROM {table}")).scalar()
+    for first in range(1, last_id + 1, BACKFILL_CHUNK_SIZE):
+        connection.execute(statement, first=first, last=first + BACKFILL_CHUNK_SIZE - 1)
+        connection.execute(sa.text("COMMIT"))
+
+
+def upgrade():
+    op.execute(
+        "ALTER TABLE order_items "
+        "ADD COLUMN service_id INTEGER NULL, "
+        "ADD COLUMN price DECIMAL(12, 2) NULL, "
+        "ALGORITHM=INPLACE, LOCK=NONE"
+    )
+    op.execute("ALTER TABLE orders ADD COLUMN total DECIMAL(12, 2) NOT NULL DEFAULT 0, ALGORITHM=INPLACE, LOCK=NONE")
+    backfill(BACKFILL_ITEMS, "order_items")
+    backfill(BACKFILL_TOTALS, "orders")
+
+
+def downgrade():
+    op.execute("ALTER TABLE orders DROP COLUMN total, ALGORITHM=INPLACE, LOCK=NONE")
+    op.execute("ALTER TABLE order_items DROP COLUMN price, DROP COLUMN service_id, ALGORITHM=INPLACE, LOCK=NONE")
@@ -0,0 +1,83 @@
+# pylint: skip-file
+"""Require service and price of order items
+
+Run after the code writing price snapshots is deployed. Items the previous code inserted after
+9616197b4b63 are backfilled and their order totals recomputed first, then the columns are made NOT NULL
+and the foreign key is added, all with online DDL. foreign_key_checks is off while adding the key so it can be
+built in place, every service_id was just copied from an existing order.
+The backfill statements and helper are a deliberate copy of those in 9616197b4b63, migrations are kept
+self-contained so that a revision runs the same whenever it is applied. Fix both copies together.
+
+Revision ID: ae1a00be2d84
+Revises: 9616197b4b63
+Create Date: 2026-10-18 19:05:37.802146
+
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "ae1a00be2d84"
+down_revision = "9616197b4b63"
+branch_labels = None
+depends_on = None
+
+BACKFILL_CHUNK_SIZE = 10000
+
+BACKFILL_ITEMS = sa.text(
+    "UPDATE order_items "
+    "JOIN orders ON orders.id = order_items.order_id "
+    "JOIN services ON services.id = orders.service_id "
+    "SET order_items.service_id = orders.service_id, order_items.price = CAST(services.price AS DECIMAL(12, 2)) "
+    "WHERE order_items.id BETWEEN :first AND :last AND order_items.price IS NULL"
+)
+BACKFILL_TOTALS = sa.text(
+    "UPDATE orders "
+    "JOIN (SELECT order_id, SUM(price) AS total FROM order_items "
+    "WHERE order_id BETWEEN :first AND :last GROUP BY order_id) AS totals ON totals.order_id = orders.id "
+    "SET orders.total = totals.total, orders.modified_on = orders.modified_on "
+    "WHERE orders.total <> totals.total"
+)
+
+
+def backfill(statement, table):
+    """Runs statement over id ranges of table, alembic keeps one transaction per migration so chunks commit here."""
+    if context.is_offline_mode():
+        # no connection to read MAX(id) from, the generated script covers every id in one statement
+        op.execute(statement.bindparams(first=1, last=2**31 - 1))
+        return
+    connection = op.get_bind()
+    last_id = connection.execute(sa.text(f"SELECT COALESCE(MAX(id), 0) FROM {table}")).scalar()
+    for first in range(1, last_id + 1, BACKFILL_CHUNK_SIZE):
+        connection.execute(statement, first=first, last=first + BACKFILL_CHUNK_SIZE - 1)
+        connection.execute(sa.text("COMMIT"))
+
+
+def upgrade():
+    backfill(BACKFILL_ITEMS, "order_items")
+    backfill(BACKFILL_TOTALS, "orders")
+    op.execute(
+        "ALTER TABLE order_items "
+        "MODIFY service_id INTEGER NOT NULL, "
+        "MODIFY price DECIMAL(12, 2) NOT NULL, "
+        "ALGORITHM=INPLACE, LOCK=NONE"
+    )
+    op.execute("SET foreign_key_checks = 0")
+    op.execute(
+        "ALTER TABLE order_items "
+        "ADD CONSTRAINT order_items_service_id_fkey FOREIGN KEY (service_id) REFERENCES services (id), "
+        "ALGORITHM=INPLACE, LOCK=NONE"
+    )
+    op.execute("SET foreign_key_checks = 1")
+
+
+def downgrade():
+    op.execute("ALTER TABLE order_items DROP FOREIGN KEY order_items_service_id_fkey, ALGORITHM=INPLACE, LOCK=NONE")
+    op.execute("ALTER TABLE order_items DROP INDEX order_items_service_id_fkey, ALGORITHM=INPLACE, LOCK=NONE")
+    op.execute(
+        "ALTER TABLE order_items "
+        "MODIFY service_id INTEGER NULL, "
+        "MODIFY price DECIMAL(12, 2) NULL, "
+        "ALGORITHM=INPLACE, LOCK=NONE"
+    )
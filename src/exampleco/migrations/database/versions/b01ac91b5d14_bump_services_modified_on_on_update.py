@@ -0,0 +1,28 @@
+# pylint: skip-file
+"""Bump services.modified_on on update
+
+Revision ID: b01ac91b5d14
+Revises: b9b63f5db0dd
+Create Date: 2026-10-18 12:31:05.804127
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "b01ac91b5d14"
+down_revision = "b9b63f5db0dd"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(
+        "ALTER TABLE services MODIFY modified_on TIMESTAMP NOT NULL "
+        "DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP"
+    )
+
+
+def downgrade():
+    op.execute("ALTER TABLE services MODIFY modified_on TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP")
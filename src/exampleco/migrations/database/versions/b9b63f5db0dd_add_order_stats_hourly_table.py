@@ -0,0 +1,34 @@
+# pylint: skip-file
+"""Add order_stats_hourly rollup table
+
+Revision ID: b9b63f5db0dd
+Revises: 3da80f9d5bc5
+Create Date: 2026-10-18 12:05:47.530912
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "b9b63f5db0dd"
+down_revision = "3da80f9d5bc5"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "order_stats_hourly",
+        sa.Column("bucket", sa.DateTime(), nullable=False),
+        sa.Column("orders_count", sa.Integer(), server_default=sa.text("0"), nullable=False),
+        sa.PrimaryKeyConstraint("bucket"),
+    )
+    op.execute(
+        "INSERT INTO order_stats_hourly (bucket, orders_count) "
+        "SELECT DATE_FORMAT(created_on, '%Y-%m-%d %H:00:00') AS bucket, COUNT(id) FROM orders GROUP BY bucket"
+    )
+
+
+def downgrade():
+    op.drop_table("order_stats_hourly")
@@ -0,0 +1,27 @@
+# pylint: skip-file
+"""Add orders created_on index
+
+Built with online DDL so it can be applied while the table takes writes.
+
+Revision ID: c69c0da6ab7d
+Revises: b01ac91b5d14
+Create Date: 2026-10-18 13:52:40.271963
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "c69c0da6ab7d"
+down_revision = "b01ac91b5d14"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("ALTER TABLE orders ADD INDEX ix_orders_created_on (created_on), ALGORITHM=INPLACE, LOCK=NONE")
+
+
+def downgrade():
+    op.execute("ALTER TABLE orders DROP INDEX ix_orders_created_on, ALGORITHM=INPLACE, LOCK=NONE")
@@ -5,4 +5,7 @@ setup(
     version="1.0.0",
     packages=find_packages(),
     include_package_data=True,
+    entry_points={
+        "console_scripts": ["exampleco-export=exampleco.export:main"],
+    },
 )
@@ -1,11 +1,14 @@
 import pytest
 from sqlalchemy import create_engine
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy.sql.expression import ClauseElement, Executable
 
 from sqlalchemy_utils import create_database, database_exists, drop_database
 from exampleco.models.database import Base
 from exampleco.models.database.services import Service
 from exampleco.models.database.orders import Order, OrderItem
+from exampleco.models.database.stats import OrderStatsHourly
 
 
 DB_ROOT_USER = "root"
@@ -40,3 +43,18 @@ def setup_database(connection):
 @pytest.fixture
 def db_session(setup_database, connection):
     return scoped_session(sessionmaker(autocommit=False, autoflush=False, bind=connection))
+
+
+class Explain(Executable, ClauseElement):
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(Explain, "mysql")
+def compile_explain(element, compiler, **kwargs):
+    return "EXPLAIN " + compiler.process(element.statement, **kwargs)
+
+
+def explain(connection, statement):
+    """Returns EXPLAIN output of a statement as a list of dicts, one per table access."""
+    return [dict(row) for row in connection.execute(Explain(statement))]
@@ -0,0 +1,76 @@
+from exampleco.utils.cache import LocalBackend, LRUCache, TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_cache_expires_entries():
+    clock = FakeClock()
+    cache = TTLCache("test", ttl=10, backend=LocalBackend(clock=clock))
+    cache.set("key", "value")
+    assert cache.get("key") == "value"
+    clock.now = 9.9
+    assert cache.get("key") == "value"
+    clock.now = 10
+    assert cache.get("key") is None
+
+
+def test_ttl_cache_delete_is_namespaced():
+    backend = LocalBackend()
+    first = TTLCache("first", ttl=10, backend=backend)
+    second = TTLCache("second", ttl=10, backend=backend)
+    first.set("key", 1)
+    second.set("key", 2)
+    first.delete("key")
+    assert first.get("key") is None
+    assert second.get("key") == 2
+
+
+def test_ttl_cache_clear_is_namespaced():
+    backend = LocalBackend()
+    first = TTLCache("first", ttl=10, backend=backend)
+    second = TTLCache("second", ttl=10, backend=backend)
+    first.set("a", 1)
+    first.set("b", 2)
+    second.set("a", 3)
+    first.clear()
+    assert (first.get("a"), first.get("b")) == (None, None)
+    assert second.get("a") == 3
+
+
+def test_local_backend_purges_expired_entries_when_full():
+    clock = FakeClock()
+    backend = LocalBackend(clock=clock)
+    backend.max_entries = 2
+    backend.set("a", 1, ttl=1)
+    backend.set("b", 2, ttl=5)
+    clock.now = 2
+    backend.set("c", 3, ttl=5)
+    assert backend._data.keys() == {"b", "c"}
+
+
+def test_local_backend_evicts_soonest_expiring_when_full():
+    clock = FakeClock()
+    backend = LocalBackend(clock=clock)
+    backend.max_entries = 2
+    backend.set("a", 1, ttl=5)
+    backend.set("b", 2, ttl=3)
+    backend.set("a", 4, ttl=5)
+    backend.set("c", 3, ttl=5)
+    assert backend._data.keys() == {"a", "c"}
+    assert backend.get("a") == 4
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    assert cache.set("a", 1) is False
+    assert cache.set("b", 2) is False
+    assert cache.get("a") == 1
+    assert cache.set("c", 3) is True
+    assert cache.get("b") is None
+    assert sorted(cache.values()) == [1, 3]
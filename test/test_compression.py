@@ -0,0 +1,54 @@
+import base64
+import gzip
+import json
+
+from exampleco.utils.compression import MIN_COMPRESS_SIZE, choose_encoding
+from exampleco.utils.conditional import not_modified
+from exampleco.utils.decorators import compress_response
+
+BODY = json.dumps([{"id": pk, "name": f"Order {pk}"} for pk in range(200)])
+
+
+@compress_response
+def handler(event, context):  # pylint: disable=unused-argument
+    return {"statusCode": 200, "headers": {"ETag": '"abc"'}, "body": event["body"]}
+
+
+def test_choose_encoding():
+    assert choose_encoding(None) is None
+    assert choose_encoding("identity") is None
+    assert choose_encoding("gzip, deflate") == "gzip"
+    assert choose_encoding("GZIP;q=0.5") == "gzip"
+    assert choose_encoding("gzip;q=0") is None
+    assert choose_encoding("br;q=0, *") == "gzip"
+
+
+def test_compress_response():
+    response = handler({"body": BODY, "headers": {"accept-encoding": "gzip"}}, None)
+    assert response["isBase64Encoded"] is True
+    assert response["headers"] == {"ETag": 'W/"abc"', "Vary": "Accept-Encoding", "Content-Encoding": "gzip"}
+    assert gzip.decompress(base64.b64decode(response["body"])).decode() == BODY
+    assert len(response["body"]) < len(BODY)
+
+
+def test_compress_response_skipped():
+    response = handler({"body": BODY}, None)
+    assert response == {"statusCode": 200, "headers": {"ETag": '"abc"', "Vary": "Accept-Encoding"}, "body": BODY}
+
+    small = BODY[: MIN_COMPRESS_SIZE - 1]
+    response = handler({"body": small, "headers": {"accept-encoding": "gzip"}}, None)
+    assert response == {"statusCode": 200, "headers": {"ETag": 'W/"abc"', "Vary": "Accept-Encoding"}, "body": small}
+
+
+def test_compress_response_not_modified():
+    @compress_response
+    def conditional_handler(event, context):  # pylint: disable=unused-argument
+        return not_modified('"abc"')
+
+    compressed = handler({"body": BODY, "headers": {"accept-encoding": "gzip"}}, None)
+    response = conditional_handler({"headers": {"accept-encoding": "gzip", "if-none-match": 'W/"abc"'}}, None)
+    assert response == {"statusCode": 304, "headers": {"ETag": 'W/"abc"', "Vary": "Accept-Encoding"}}
+    assert response["headers"]["ETag"] == compressed["headers"]["ETag"]
+
+    response = conditional_handler({"headers": {"if-none-match": '"abc"'}}, None)
+    assert response == {"statusCode": 304, "headers": {"ETag": '"abc"', "Vary": "Accept-Encoding"}}
@@ -0,0 +1,46 @@
+import datetime
+
+from exampleco.utils.conditional import (
+    cache_headers,
+    is_conditional,
+    is_not_modified,
+    make_etag,
+    make_version_etag,
+    not_modified,
+)
+
+MODIFIED_ON = datetime.datetime(2022, 9, 20, 19, 18, 9)
+
+
+def test_make_etag():
+    etag = make_etag("order", 1, MODIFIED_ON)
+    assert etag.startswith('"') and etag.endswith('"')
+    assert etag == make_etag("order", 1, MODIFIED_ON)
+    assert etag != make_etag("order", 1, MODIFIED_ON + datetime.timedelta(seconds=1))
+    assert make_version_etag("order", 1, MODIFIED_ON) == "W/" + etag
+    assert is_not_modified({"headers": {"if-none-match": etag}}, make_version_etag("order", 1, MODIFIED_ON))
+
+
+def test_if_none_match():
+    etag = make_etag("service", 1)
+    assert not is_conditional({})
+    assert not is_not_modified({}, etag)
+    assert is_not_modified({"headers": {"if-none-match": etag}}, etag)
+    assert is_not_modified({"headers": {"If-None-Match": f'"other", W/{etag}'}}, etag)
+    assert is_not_modified({"headers": {"if-none-match": "*"}}, etag)
+    assert not is_not_modified({"headers": {"if-none-match": '"other"'}}, etag)
+    # If-None-Match takes precedence over If-Modified-Since
+    event = {"headers": {"if-none-match": '"other"', "if-modified-since": "Tue, 20 Sep 2022 19:18:09 GMT"}}
+    assert is_conditional(event)
+    assert not is_not_modified(event, etag, MODIFIED_ON)
+
+
+def test_if_modified_since():
+    etag = make_etag("service", 1)
+    headers = cache_headers(etag, MODIFIED_ON)
+    assert headers == {"ETag": etag, "Last-Modified": "Tue, 20 Sep 2022 19:18:09 GMT"}
+    event = {"headers": {"if-modified-since": headers["Last-Modified"]}}
+    assert is_not_modified(event, etag, MODIFIED_ON.replace(microsecond=500))
+    assert not is_not_modified(event, etag, MODIFIED_ON + datetime.timedelta(seconds=1))
+    assert not is_not_modified({"headers": {"if-modified-since": "yesterday"}}, etag, MODIFIED_ON)
+    assert not_modified(etag, MODIFIED_ON) == {"statusCode": 304, "headers": headers}
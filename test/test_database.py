@@ -0,0 +1,80 @@
+import json
+import logging
+from unittest.mock import patch
+
+from sqlalchemy import create_engine
+from exampleco.models import database
+from exampleco.models.database.pool import TimedQueuePool, pool_metrics
+from exampleco.models.database.querystats import QueryStats, install_query_stats, query_stats
+
+from .conftest import db_config
+
+
+@patch("exampleco.models.database._engine", None)
+@patch("exampleco.models.database.get_db_config", return_value=db_config)
+def test_engine_is_shared_and_lazy(mock_get_db_config):  # pylint: disable=unused-argument
+    engine = database.get_engine()
+    assert database.get_engine() is engine
+    assert database.get_session_maker().kw["bind"] is engine
+    assert isinstance(engine.pool, TimedQueuePool)
+    assert engine.pool.checkedout() == 0
+    assert engine.pool._pre_ping
+
+
+@patch.dict("os.environ", {"DB_POOL_SIZE": "5", "DB_POOL_RECYCLE": "60", "DB_POOL_PRE_PING": "false"})
+def test_pool_config_from_environment():
+    config = database.get_pool_config()
+    assert config["pool_size"] == 5
+    assert config["pool_recycle"] == 60
+    assert config["pool_pre_ping"] is False
+
+
+def test_pool_records_checkout_wait():
+    engine = create_engine("sqlite://", poolclass=TimedQueuePool)
+    pool_metrics.reset()
+    with engine.connect() as connection:
+        connection.execute("SELECT 1")
+    snapshot = pool_metrics.snapshot()
+    assert snapshot["checkouts"] == 1
+    assert snapshot["max_wait_ms"] >= 0
+
+
+def test_query_stats():
+    stats = QueryStats(slow_query_seconds=1, repeated_query_threshold=3)
+    stats.record("SELECT 0", 5)
+    assert stats.finish() == {}
+
+    stats.start()
+    for _ in range(3):
+        stats.record("SELECT * FROM order_items WHERE order_id = %s", 0.001)
+    stats.record("SELECT\n  2", 2)
+    summary = stats.finish()
+    assert summary["queries"] == 4
+    assert summary["slow_queries"] == 1
+    assert summary["slowest_ms"] == 2000
+    assert summary["slowest_statement"] == "SELECT 2"
+    assert summary["repeated_queries"] == [{"statement": "SELECT * FROM order_items WHERE order_id = %s", "count": 3}]
+    assert not stats.active
+
+
+def test_handler_logs_query_stats(caplog):
+    from exampleco.utils.decorators import handle_exception
+
+    engine = create_engine("sqlite://")
+    install_query_stats(engine)
+
+    @handle_exception
+    def handler(event, context):  # pylint: disable=unused-argument
+        for _ in range(query_stats.repeated_query_threshold):
+            engine.execute("SELECT 1")
+        return {"statusCode": 200}
+
+    with caplog.at_level(logging.INFO, logger="exampleco.sqltime"):
+        assert handler({}, None) == {"statusCode": 200}
+    [record] = [record for record in caplog.records if record.message.startswith("{")]
+    line = json.loads(record.message)
+    assert line["handler"] == "handler"
+    assert line["status"] == 200
+    assert line["queries"] == query_stats.repeated_query_threshold
+    assert line["repeated_queries"][0]["statement"] == "SELECT 1"
+    assert record.levelno == logging.WARNING
@@ -0,0 +1,109 @@
+import datetime
+import itertools
+
+import pytest
+from exampleco.models.database.orders import Order
+from exampleco.models.database.services import Service
+from exampleco.models.database.stats import count_by_hour
+
+from .conftest import explain
+
+ORDERS_COUNT = 5000
+NO_SECONDARY_INDEXES = (
+    "IGNORE INDEX (ix_orders_status_created_on_id, ix_orders_created_on, ix_orders_modified_on_id, "
+    "ix_orders_status_service_id_created_on_id, ix_orders_status_name_id, ix_orders_status_service_id_name_id)"
+)
+LIST_FILTERS = ("service_id", "created_from", "name_prefix")
+# filters an index can serve together with the sort key without sorting rows
+SORTED_BY_INDEX = {"created_on": {"service_id", "created_from"}, "name": {"service_id", "name_prefix"}}
+
+
+@pytest.fixture(scope="module")
+def many_orders(setup_database, connection):
+    service_id = connection.execute(Service.__table__.insert(), {"name": "Index Service", "price": 1}).lastrowid
+    start = datetime.datetime.now() - datetime.timedelta(days=730)
+    step = datetime.timedelta(days=730) / ORDERS_COUNT
+    connection.execute(
+        Order.__table__.insert(),
+        [
+            {
+                "name": f"Index Order {i}",
+                "service_id": service_id,
+                "created_on": start + step * i,
+                "modified_on": start + step * i,
+            }
+            for i in range(ORDERS_COUNT)
+        ],
+    )
+    connection.execute("ANALYZE TABLE orders")
+    yield service_id
+    connection.execute(Order.__table__.delete().where(Order.service_id == service_id))
+    connection.execute(Service.__table__.delete().where(Service.id == service_id))
+
+
+def test_orders_page_uses_keyset_index(many_orders, connection):  # pylint: disable=unused-argument
+    from exampleco.api.orders import orders_page_query
+
+    query = orders_page_query(100, (datetime.datetime.now() - datetime.timedelta(days=365), 0))
+
+    [before] = explain(connection, query.with_hint(Order, NO_SECONDARY_INDEXES, "mysql").statement)
+    assert before["type"] == "ALL"
+    assert "filesort" in before["Extra"]
+
+    [after] = explain(connection, query.statement)
+    assert after["key"] == "ix_orders_status_created_on_id"
+    assert after["type"] == "range"
+    assert "filesort" not in (after["Extra"] or "")
+
+
+def test_stats_compaction_uses_created_on_index(many_orders, connection):  # pylint: disable=unused-argument
+    statement = count_by_hour(Order.created_on >= datetime.datetime.now() - datetime.timedelta(days=1))
+
+    [before] = explain(connection, statement.with_hint(Order.__table__, NO_SECONDARY_INDEXES, "mysql"))
+    assert before["type"] == "ALL"
+
+    [after] = explain(connection, statement)
+    assert after["key"] == "ix_orders_created_on"
+    assert after["type"] == "range"
+    assert "Using index" in after["Extra"]
+
+
+def test_order_changes_use_modified_on_index(many_orders, connection):  # pylint: disable=unused-argument
+    from exampleco.api.orders import order_changes_query
+
+    query = order_changes_query(100, (datetime.datetime.now() - datetime.timedelta(days=365), 0))
+
+    [before] = explain(connection, query.with_hint(Order, NO_SECONDARY_INDEXES, "mysql").statement)
+    assert before["type"] == "ALL"
+    assert "filesort" in before["Extra"]
+
+    [after] = explain(connection, query.statement)
+    assert after["key"] == "ix_orders_modified_on_id"
+    assert after["type"] == "range"
+    assert "filesort" not in (after["Extra"] or "")
+
+
+@pytest.mark.parametrize("status", ["ACTIVE", "DELETED"])
+@pytest.mark.parametrize("sort", ["created_on", "-created_on", "name", "-name"])
+@pytest.mark.parametrize(
+    "filters", [combination for size in range(4) for combination in itertools.combinations(LIST_FILTERS, size)]
+)
+def test_order_list_filters_use_index(many_orders, connection, filters, sort, status):
+    from exampleco.api.orders import order_list_conditions, orders_page_query
+
+    values = {
+        "service_id": str(many_orders),
+        "created_from": (datetime.datetime.now() - datetime.timedelta(days=30)).isoformat(),
+        "name_prefix": "Index Order 12",
+    }
+    params = {"status": status, **{name: values[name] for name in filters}}
+    key = sort.lstrip("-")
+    cursor_value = "Index Order 2" if key == "name" else datetime.datetime.now() - datetime.timedelta(days=365)
+    cursor = (cursor_value, 10**9 if sort.startswith("-") else 0)
+    query = orders_page_query(100, cursor, conditions=order_list_conditions(params), sort=sort)
+
+    [plan] = explain(connection, query.statement)
+    assert plan["key"] is not None
+    assert plan["type"] in ("ref", "range")
+    if set(filters) <= SORTED_BY_INDEX[key]:
+        assert "filesort" not in (plan["Extra"] or "")
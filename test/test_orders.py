@@ -1,9 +1,15 @@
+import csv
+import datetime
 import json
+import tracemalloc
 from unittest.mock import patch
 
 import pytest
+from exampleco.models.database import Session
+from exampleco.models.database.catalog import service_catalog
 from exampleco.models.database.orders import Order, OrderItem, OrderStatuses
 from exampleco.models.database.services import Service
+from exampleco.models.database.stats import OrderStatsHourly
 from .conftest import db_config
 
 test_services_data_list = [
@@ -47,17 +53,19 @@ def create_orders(db_session):
     db_session.commit()
     order_instances = []
     for data, service in zip(test_orders_data_list, service_instances):
-        instance = Order(name=data["name"], service_id=service.id)
+        total = service.price * len(data["order_items"])
+        instance = Order(name=data["name"], service_id=service.id, total=total)
         order_instances.append(instance)
         db_session.add(instance)
     db_session.commit()
     order_item_instances = []
-    for order, order_data in zip(order_instances, test_orders_data_list):
+    for order, order_data, service in zip(order_instances, test_orders_data_list, service_instances):
         for item_data in order_data["order_items"]:
-            item_instance = OrderItem(**item_data, order_id=order.id)
+            item_instance = OrderItem(**item_data, order_id=order.id, service_id=service.id, price=service.price)
             order_item_instances.append(item_instance)
             db_session.add(item_instance)
     db_session.commit()
+    service_catalog.clear()
     yield
     for instance in order_item_instances:
         db_session.delete(instance)
@@ -74,12 +82,148 @@ def test_get_orders(mock_get_db_config, create_orders):  # pylint: disable=unuse
 
     response = get_all_orders({}, None)
     body = json.loads(response["body"])
-    assert len(body) == len(test_orders_data_list)
-    for actual, expected in zip(sorted(body, key=lambda x: x["id"]), test_orders_data_list):
+    assert len(body["results"]) == len(test_orders_data_list)
+    assert body["next_cursor"] is None
+    for actual, expected in zip(sorted(body["results"], key=lambda x: x["id"]), test_orders_data_list):
         assert actual["name"] == expected["name"]
         assert "order_items" not in actual
 
 
+@patch("exampleco.models.database.get_db_config", return_value=db_config)
+def test_get_orders_paginated(mock_get_db_config, create_orders):  # pylint: disable=unused-argument
+    from exampleco.api.orders import get_all_orders
+
+    names = []
+    params = {"limit": "1"}
+    while True:
+        response = get_all_orders({"queryStringParameters": params}, None)
+        body = json.loads(response["body"])
+        assert len(body["results"]) <= 1
+        names.extend(order["name"] for order in body["results"])
+        if body["next_cursor"] is None:
+            break
+        params = {"limit": "1", "cursor": body["next_cursor"]}
+    assert sorted(names) == [data["name"] for data in test_orders_data_list]
+
+
+@patch("exampleco.models.database.get_db_config", return_value=db_config)
+def test_get_orders_filtered(mock_get_db_config, create_orders, db_session):  # pylint: disable=unused-argument
+    from exampleco.api.orders import delete_order, get_all_orders
+
+    def names(params):
+        result = []
+        params = {**params, "limit": "1", "fields": "name"}
+        while True:
+            body = json.loads(get_all_orders({"queryStringParameters": params}, None)["body"])
+            result.extend(order["name"] for order in body["results"])
+            if body["next_cursor"] is None:
+                return result
+            params["cursor"] = body["next_cursor"]
+
+    all_names = [data["name"] for data in test_orders_data_list]
+    assert names({"sort": "-name"}) == all_names[::-1]
+    assert names({"name_prefix": "Test Order 2"}) == ["Test Order 2"]
+    assert names({"name_prefix": "Test_"}) == []
+
+    order = db_session.query(Order).filter(Order.name == "Test Order 3").one()
+    assert names({"service_id": str(order.service_id)}) == ["Test Order 3"]
+    assert names({"created_from": order.created_on.isoformat(), "sort": "name"})[-1] == "Test Order 3"
+    assert names({"created_to": order.created_on.isoformat(), "service_id": str(order.service_id)}) == []
+
+    delete_order({"pathParameters": {"pk": order.id}}, None)
+    assert names({"status": "DELETED"}) == ["Test Order 3"]
+    assert names({}) == all_names[:2]
+
+
+@pytest.mark.parametrize(
+    "params", [{"sort": "id"}, {"status": "GONE"}, {"service_id": "one"}, {"created_from": "yesterday"}]
+)
+@patch("exampleco.models.database.get_db_config", return_value=db_config)
+def test_get_orders_invalid_filters(mock_get_db_config, params):  # pylint: disable=unused-argument
+    from exampleco.api.orders import get_all_orders
+
+    assert get_all_orders({"queryStringParameters": params}, None)["statusCode"] == 400
+
+
+@pytest.mark.parametrize("params", [{"limit": "0"}, {"limit": "abc"}, {"cursor": "not-a-cursor"}])
+@patch("exampleco.models.database.get_db_config", return_value=db_config)
+def test_get_orders_invalid_pagination(mock_get_db_config, params):  # pylint: disable=unused-argument
+    from exampleco.api.orders import get_all_orders
+
+    response = get_all_orders({"queryStringParameters": params}, None)
+    assert response["statusCode"] == 400
+
+
+@patch("exampleco.models.database.get_db_config", return_value=db_config)
+def test_get_order_changes(mock_get_db_config, create_orders, db_session):  # pylint: disable=unused-argument
+    from exampleco.api.orders import delete_order, get_order_changes
+
+    hour_ago = datetime.datetime.now().replace(microsecond=0) - datetime.timedelta(hours=1)
+    db_session.query(Order).update({Order.modified_on: hour_ago}, synchronize_session=False)
+    db_session.commit()
+
+    names = []
+    params = {"limit": "2"}
+    while True:
+        response = get_order_changes({"queryStringParameters": params}, None)
+        body = json.loads(response["body"])
+        names.extend(order["name"] for order in body["results"])
+        params = {"limit": "2", "since": body["next_cursor"]}
+        if not body["has_more"]:
+            break
+    assert names == [data["name"] for data in test_orders_data_list]
+
+    order = db_session.query(Order).first()
+    delete_order({"pathParameters": {"pk": order.id}}, None)
+    db_session.refresh(order)
+    assert order.modified_on > hour_ago
+
+    # the deletion has not settled yet
+    body = json.loads(get_order_changes({"queryStringParameters": params}, None)["body"])
+    assert body["results"] == []
+    assert body["next_cursor"] == params["since"]
+
+    with patch("exampleco.api.orders.CHANGES_SETTLE_SECONDS", -60):
+        body = json.loads(get_order_changes({"queryStringParameters": params}, None)["body"])
+    assert [(change["id"], change["status"]) for change in body["results"]] == [(order.id, "DELETED")]
+
+
+@pytest.mark.parametrize("params", [{"limit": "0"}, {"since": "not-a-cursor"}])
+@patch("exampleco.models.database.get_db_config", return_value=db_config)
+def test_get_order_changes_invalid(mock_get_db_config, params):  # pylint: disable=unused-argument
+    from exampleco.api.orders import get_order_changes
+
+    assert get_order_changes({"queryStringParameters": params}, None)["statusCode"] == 400
+
+
+@patch("exampleco.models.database.get_db_config", return_value=db_config)
+def test_get_orders_by_ids(mock_get_db_config, create_orders, db_session):  # pylint: disable=unused-argument
+    from exampleco.api.orders import delete_order, get_all_orders
+
+    orders = db_session.query(Order).order_by(Order.id).all()
+    delete_order({"pathParameters": {"pk": orders[1].id}}, None)
+    missing_id = orders[-1].id + 1000
+    ids = [orders[2].id, orders[0].id, orders[1].id, missing_id]
+
+    response = get_all_orders({"queryStringParameters": {"ids": ",".join(map(str, ids))}}, None)
+    body = json.loads(response["body"])
+    assert [order["id"] for order in body["results"]] == [orders[2].id, orders[0].id]
+    order_items = sorted(body["results"][1]["order_items"], key=lambda x: x["id"])
+    assert [item["name"] for item in order_items] == [item["name"] for item in test_orders_data_list[0]["order_items"]]
+    assert body["errors"] == {
+        str(orders[1].id): f"order with id {orders[1].id} does not exist.",
+        str(missing_id): f"order with id {missing_id} does not exist.",
+    }
+
+
+@patch("exampleco.models.database.get_db_config", return_value=db_config)
+def test_get_orders_by_invalid_ids(mock_get_db_config):  # pylint: disable=unused-argument
+    from exampleco.api.orders import get_all_orders
+
+    response = get_all_orders({"queryStringParameters": {"ids": "1,two"}}, None)
+    assert response["statusCode"] == 400
+
+
 @patch("exampleco.models.database.get_db_config", return_value=db_config)
 def test_get_order_does_not_exist(mock_get_db_config, create_orders):  # pylint: disable=unused-argument
     from exampleco.api.orders import get_order
@@ -104,6 +248,55 @@ def test_get_order(mock_get_db_config, create_orders, db_session):  # pylint: di
         test_orders_data_list[0]["order_items"],
     ):
         assert actual["name"] == expected["name"]
+        assert actual["price"] == pytest.approx(test_services_data_list[0]["price"])
+    assert body["total"] == pytest.approx(sum(item["price"] for item in order_items))
+
+
+@patch("exampleco.models.database.get_db_config", return_value=db_config)
+def test_get_order_conditional(mock_get_db_config, create_orders, db_session):  # pylint: disable=unused-argument
+    from exampleco.api.orders import get_order
+
+    order = db_session.query(Order).first()
+    event = {"pathParameters": {"pk": order.id}}
+    headers = get_order(event, None)["headers"]
+    assert headers["ETag"].startswith('W/"')
+
+    response = get_order({**event, "headers": {"if-none-match": headers["ETag"]}}, None)
+    assert response == {"statusCode": 304, "headers": headers}
+    response = get_order({**event, "headers": {"if-modified-since": headers["Last-Modified"]}}, None)
+    assert response["statusCode"] == 304
+
+    db_session.add(OrderItem(name="Test Item 7", order_id=order.id, service_id=order.service_id, price=0))
+    db_session.commit()
+    response = get_order({**event, "headers": {"if-none-match": headers["ETag"]}}, None)
+    assert response["statusCode"] == 200
+    assert response["headers"]["ETag"] != headers["ETag"]
+    assert len(json.loads(response["body"])["order_items"]) == len(test_orders_data_list[0]["order_items"]) + 1
+    db_session.query(OrderItem).filter(OrderItem.name == "Test Item 7").delete()
+    db_session.commit()
+
+
+@patch("exampleco.models.database.get_db_config", return_value=db_config)
+def test_get_order_fields(mock_get_db_config, create_orders, db_session):  # pylint: disable=unused-argument
+    from exampleco.api.orders import get_all_orders, get_order
+
+    order = db_session.query(Order).first()
+    event = {"pathParameters": {"pk": order.id}, "queryStringParameters": {"fields": "id,name"}}
+    assert json.loads(get_order(event, None)["body"]) == {"id": order.id, "name": order.name}
+
+    event["queryStringParameters"] = {"fields": "order_items.name"}
+    body = json.loads(get_order(event, None)["body"])
+    assert body == {"order_items": [{"name": item["name"]} for item in test_orders_data_list[0]["order_items"]]}
+
+    event["queryStringParameters"] = {"fields": "bogus"}
+    assert get_order(event, None)["statusCode"] == 400
+
+    body = json.loads(get_all_orders({"queryStringParameters": {"fields": "name"}}, None)["body"])
+    assert body["results"] == [{"name": data["name"]} for data in test_orders_data_list]
+
+    params = {"ids": str(order.id), "fields": "id,order_items.id"}
+    body = json.loads(get_all_orders({"queryStringParameters": params}, None)["body"])
+    assert body["results"] == [{"id": order.id, "order_items": [{"id": item.id} for item in order.order_items]}]
 
 
 @patch("exampleco.models.database.get_db_config", return_value=db_config)
@@ -122,6 +315,38 @@ def test_update_order(mock_get_db_config, create_orders, db_session):  # pylint:
     assert order.service_id == payload["service_id"]
 
 
+@patch("exampleco.models.database.get_db_config", return_value=db_config)
+def test_update_order_deleted_concurrently(
+    mock_get_db_config, create_orders, db_session
+):  # pylint: disable=unused-argument
+    from exampleco.api.orders import update_order
+
+    order = db_session.query(Order).first()
+    payload = {"name": "TEST ORDER 1 NEW NAME!"}
+    with patch("exampleco.api.orders.get_active_order", return_value=None):
+        response = update_order({"pathParameters": {"pk": order.id}, "body": json.dumps(payload)}, None)
+    assert response["statusCode"] == 404
+    assert json.loads(response["body"])["error"] == f"order with id {order.id} does not exist."
+
+
+@patch("exampleco.models.database.get_db_config", return_value=db_config)
+def test_update_order_invalid(mock_get_db_config, create_orders, db_session):  # pylint: disable=unused-argument
+    from exampleco.api.orders import delete_order, update_order
+
+    order, deleted_order = db_session.query(Order).order_by(Order.id).limit(2).all()
+    payload = {"name": "TEST ORDER NEW NAME!", "service_id": -1}
+    response = update_order({"pathParameters": {"pk": order.id}, "body": json.dumps(payload)}, None)
+    assert response["statusCode"] == 400
+    db_session.refresh(order)
+    assert order.name == test_orders_data_list[0]["name"]
+
+    delete_order({"pathParameters": {"pk": deleted_order.id}}, None)
+    payload = {"name": "TEST ORDER NEW NAME!"}
+    response = update_order({"pathParameters": {"pk": deleted_order.id}, "body": json.dumps(payload)}, None)
+    assert response["statusCode"] == 404
+    assert delete_order({"pathParameters": {"pk": deleted_order.id}}, None)["statusCode"] == 404
+
+
 @patch("exampleco.models.database.get_db_config", return_value=db_config)
 def test_delete_order(mock_get_db_config, create_orders, db_session):  # pylint: disable=unused-argument
     from exampleco.api.orders import delete_order, get_order
@@ -133,3 +358,260 @@ def test_delete_order(mock_get_db_config, create_orders, db_session):  # pylint:
     response = get_order({"pathParameters": {"pk": order.id}}, None)
     body = json.loads(response["body"])
     assert body["error"] == f"order with id {order.id} does not exist."
+
+
+@patch("exampleco.models.database.get_db_config", return_value=db_config)
+def test_orders_stats(mock_get_db_config, create_orders, db_session):  # pylint: disable=unused-argument
+    from exampleco.api.orders import compact_orders_stats, create_order, orders_stats
+
+    compact_orders_stats({}, None)
+    service = db_session.query(Service).first()
+    response = create_order({"body": json.dumps({"name": "Test Stats Order", "service_id": service.id})}, None)
+    created_id = json.loads(response["body"])["id"]
+    try:
+        for time_period in ("THIS_WEEK", "THIS_MONTH", "THIS_YEAR"):
+            response = orders_stats({"queryStringParameters": {"time-period": time_period}}, None)
+            body = json.loads(response["body"])
+            assert sum(body.values()) == len(test_orders_data_list) + 1
+    finally:
+        db_session.query(Order).filter(Order.id == created_id).delete()
+        db_session.query(OrderStatsHourly).delete()
+        db_session.commit()
+
+
+@patch("exampleco.models.database.get_db_config", return_value=db_config)
+def test_orders_stats_cached(mock_get_db_config, create_orders, db_session):  # pylint: disable=unused-argument
+    from exampleco.api import orders
+
+    orders.stats_cache.clear()
+    event = {"queryStringParameters": {"time-period": "THIS_WEEK"}}
+    with patch("exampleco.api.orders.hourly_counts", wraps=orders.hourly_counts) as mock_hourly_counts:
+        first = orders.orders_stats(event, None)
+        second = orders.orders_stats(event, None)
+        assert mock_hourly_counts.call_count == 1
+        assert first["body"] == second["body"]
+        conditional = {**event, "headers": {"if-none-match": first["headers"]["ETag"]}}
+        assert orders.orders_stats(conditional, None) == {"statusCode": 304, "headers": first["headers"]}
+
+        service = db_session.query(Service).first()
+        response = orders.create_order(
+            {"body": json.dumps({"name": "Test Cache Order", "service_id": service.id})}, None
+        )
+        created_id = json.loads(response["body"])["id"]
+        try:
+            orders.orders_stats(event, None)
+            assert mock_hourly_counts.call_count == 2
+        finally:
+            db_session.query(Order).filter(Order.id == created_id).delete()
+            db_session.query(OrderStatsHourly).delete()
+            db_session.commit()
+
+
+@patch("exampleco.models.database.get_db_config", return_value=db_config)
+def test_orders_stats_invalid_period(mock_get_db_config):  # pylint: disable=unused-argument
+    from exampleco.api.orders import orders_stats
+
+    response = orders_stats({"queryStringParameters": {"time-period": "THIS_CENTURY"}}, None)
+    assert response["statusCode"] == 400
+
+
+@patch("exampleco.models.database.get_db_config", return_value=db_config)
+def test_session_per_invocation(mock_get_db_config, create_orders, db_session):  # pylint: disable=unused-argument
+    from exampleco.api.orders import get_all_orders, get_order
+
+    order = db_session.query(Order).first()
+    events = [({}, get_all_orders), ({"pathParameters": {"pk": order.id}}, get_order)]
+    for event, handler in events * 50:
+        handler(event, None)
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    for event, handler in events * 1500:
+        assert handler(event, None)["statusCode"] == 200
+        assert not Session.registry.has()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert after - before < 512 * 1024
+
+
+@patch("exampleco.models.database.get_db_config", return_value=db_config)
+def test_create_orders_bulk(mock_get_db_config, create_orders, db_session):  # pylint: disable=unused-argument
+    from exampleco.api.orders import create_orders_bulk
+
+    service = db_session.query(Service).first()
+    payload = {
+        "orders": [
+            {
+                "name": f"Test Bulk Order {i}",
+                "service_id": service.id,
+                "order_items": [{"name": f"Test Bulk Item {i}"}] * i,
+            }
+            for i in range(3)
+        ]
+    }
+    response = create_orders_bulk({"body": json.dumps(payload)}, None)
+    assert response["statusCode"] == 201
+    ids = json.loads(response["body"])["ids"]
+    try:
+        created = db_session.query(Order).filter(Order.id.in_(ids)).order_by(Order.id).all()
+        assert [order.id for order in created] == ids
+        for order, expected in zip(created, payload["orders"]):
+            assert order.name == expected["name"]
+            assert [item.name for item in order.order_items] == [item["name"] for item in expected["order_items"]]
+        assert sum(row.orders_count for row in db_session.query(OrderStatsHourly)) >= len(ids)
+    finally:
+        db_session.query(OrderItem).filter(OrderItem.order_id.in_(ids)).delete(synchronize_session=False)
+        db_session.query(Order).filter(Order.id.in_(ids)).delete(synchronize_session=False)
+        db_session.query(OrderStatsHourly).delete()
+        db_session.commit()
+
+
+@patch("exampleco.models.database.get_db_config", return_value=db_config)
+def test_create_orders_bulk_prices(mock_get_db_config, create_orders, db_session):  # pylint: disable=unused-argument
+    from exampleco.api.orders import create_orders_bulk, get_all_orders, get_order
+
+    first, second = db_session.query(Service).order_by(Service.id).limit(2).all()
+    payload = {
+        "orders": [
+            {
+                "name": "Test Priced Order",
+                "service_id": first.id,
+                "order_items": [
+                    {"name": "Test Priced Item 1"},
+                    {"name": "Test Priced Item 2", "service_id": second.id},
+                ],
+            }
+        ]
+    }
+    response = create_orders_bulk({"body": json.dumps(payload)}, None)
+    assert response["statusCode"] == 201
+    order_ids = json.loads(response["body"])["ids"]
+    order_id = order_ids[0]
+    original_price = first.price
+    try:
+        first.price = 1000
+        db_session.commit()
+        body = json.loads(get_order({"pathParameters": {"pk": order_id}}, None)["body"])
+        assert [(item["service_id"], item["price"]) for item in body["order_items"]] == [
+            (first.id, pytest.approx(original_price)),
+            (second.id, pytest.approx(second.price)),
+        ]
+        assert body["total"] == pytest.approx(original_price + second.price)
+
+        params = {"ids": str(order_id), "fields": "total"}
+        body = json.loads(get_all_orders({"queryStringParameters": params}, None)["body"])
+        assert body["results"] == [{"total": pytest.approx(original_price + second.price)}]
+
+        # the new price is snapshotted right away, the service catalog cache is not consulted
+        response = create_orders_bulk({"body": json.dumps(payload)}, None)
+        order_ids.extend(json.loads(response["body"])["ids"])
+        body = json.loads(get_order({"pathParameters": {"pk": order_ids[-1]}}, None)["body"])
+        assert body["total"] == pytest.approx(1000 + second.price)
+    finally:
+        first.price = original_price
+        db_session.query(OrderItem).filter(OrderItem.order_id.in_(order_ids)).delete(synchronize_session=False)
+        db_session.query(Order).filter(Order.id.in_(order_ids)).delete(synchronize_session=False)
+        db_session.query(OrderStatsHourly).delete()
+        db_session.commit()
+
+
+@patch("exampleco.models.database.get_db_config", return_value=db_config)
+def test_create_orders_bulk_bad_service(
+    mock_get_db_config, create_orders, db_session
+):  # pylint: disable=unused-argument
+    from exampleco.api.orders import create_orders_bulk
+
+    service = db_session.query(Service).first()
+    payload = {"orders": [{"name": "Test Bulk Order", "service_id": service.id}, {"name": "X", "service_id": -1}]}
+    response = create_orders_bulk({"body": json.dumps(payload)}, None)
+    assert response["statusCode"] == 400
+    assert json.loads(response["body"])["error"] == "Services with ids [-1] do not exist."
+    assert db_session.query(Order).filter(Order.name == "Test Bulk Order").count() == 0
+
+
+@patch("exampleco.api.orders.BULK_STATUS_TIME_BUDGET", 0)
+@patch("exampleco.models.database.get_db_config", return_value=db_config)
+def test_update_orders_status_bulk(mock_get_db_config, create_orders, db_session):  # pylint: disable=unused-argument
+    from exampleco.api.orders import update_orders_status_bulk
+
+    orders = db_session.query(Order).order_by(Order.id).all()
+    payload = {"status": "DELETED", "ids": [order.id for order in orders[:2]], "chunk_size": 1}
+    updated = 0
+    calls = 0
+    while True:
+        response = update_orders_status_bulk({"body": json.dumps(payload)}, None)
+        body = json.loads(response["body"])
+        updated += body["updated"]
+        calls += 1
+        if body["next_cursor"] is None:
+            break
+        payload["cursor"] = body["next_cursor"]
+    assert updated == 2
+    assert calls >= 2
+    for order in orders:
+        db_session.refresh(order)
+    assert [order.status for order in orders] == [OrderStatuses.DELETED, OrderStatuses.DELETED, OrderStatuses.ACTIVE]
+
+    payload = {"status": "ACTIVE", "filter": {"service_id": orders[0].service_id}}
+    body = json.loads(update_orders_status_bulk({"body": json.dumps(payload)}, None)["body"])
+    assert body == {"updated": 1, "chunks": 1, "next_cursor": None}
+    db_session.refresh(orders[0])
+    assert orders[0].status == OrderStatuses.ACTIVE
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        {"status": "ARCHIVED", "ids": [1]},
+        {"status": "DELETED"},
+        {"status": "DELETED", "filter": {"created_from": "yesterday"}},
+        {"status": "DELETED", "ids": [1], "chunk_size": 0},
+    ],
+)
+@patch("exampleco.models.database.get_db_config", return_value=db_config)
+def test_update_orders_status_bulk_invalid(mock_get_db_config, payload):  # pylint: disable=unused-argument
+    from exampleco.api.orders import update_orders_status_bulk
+
+    response = update_orders_status_bulk({"body": json.dumps(payload)}, None)
+    assert response["statusCode"] == 400
+
+
+@patch("exampleco.models.database.get_db_config", return_value=db_config)
+def test_export_orders(mock_get_db_config, create_orders, db_session, tmp_path):  # pylint: disable=unused-argument
+    from exampleco.export import DirectorySink, export_orders
+
+    manifest = export_orders(db_session, DirectorySink(str(tmp_path / "ndjson")), "ndjson", rows_per_file=2)
+    assert manifest["orders"] == len(test_orders_data_list)
+    assert len(manifest["files"]) == 2
+    exported = [json.loads(line) for path in manifest["files"] for line in open(path)]
+    for actual, expected in zip(exported, test_orders_data_list):
+        assert actual["name"] == expected["name"]
+        assert sorted(item["name"] for item in actual["order_items"]) == sorted(
+            item["name"] for item in expected["order_items"]
+        )
+    assert manifest["complete"] and manifest["last_id"] == exported[-1]["id"]
+
+    manifest = export_orders(db_session, DirectorySink(str(tmp_path / "csv")), "csv")
+    with open(manifest["files"][0], newline="") as file:
+        rows = list(csv.DictReader(file))
+    assert len(rows) == sum(len(data["order_items"]) for data in test_orders_data_list)
+    assert rows[0]["name"] == test_orders_data_list[0]["name"]
+    assert rows[0]["item_name"] in {item["name"] for item in test_orders_data_list[0]["order_items"]}
+
+
+@patch("exampleco.export.EXPORT_BATCH_IDS", 1)
+@patch("exampleco.models.database.get_db_config", return_value=db_config)
+def test_export_resume(mock_get_db_config, create_orders, db_session, tmp_path):  # pylint: disable=unused-argument
+    from exampleco.export import DirectorySink, export_orders
+
+    sink = DirectorySink(str(tmp_path))
+    first_id = db_session.query(Order.id).order_by(Order.id).first()[0]
+    stops = iter([False, True])
+    first = export_orders(db_session, sink, "ndjson", after_id=first_id - 1, should_stop=lambda: next(stops))
+    assert (first["orders"], first["last_id"], first["complete"]) == (1, first_id, False)
+    rest = export_orders(db_session, sink, "ndjson", after_id=first["last_id"])
+    assert rest["complete"] and rest["orders"] == len(test_orders_data_list) - 1
+    assert not set(first["files"]) & set(rest["files"])
+    exported = [json.loads(line) for path in first["files"] + rest["files"] for line in open(path)]
+    assert [order["name"] for order in exported] == [data["name"] for data in test_orders_data_list]
+    assert db_session.execute("SELECT @@SESSION.net_write_timeout = @@GLOBAL.net_write_timeout").scalar()
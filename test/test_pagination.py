@@ -0,0 +1,25 @@
+import datetime
+
+import pytest
+from exampleco.utils.pagination import decode_cursor, encode_cursor, parse_datetime, parse_limit
+
+
+def test_cursor_round_trip():
+    values = (datetime.datetime(2022, 9, 20, 19, 18, 9), 42)
+    token = encode_cursor(values)
+    assert "=" not in token
+    assert decode_cursor(token, (parse_datetime, int)) == values
+
+
+@pytest.mark.parametrize("token", ["", "!!!", encode_cursor([1]), encode_cursor(["not a date", 1])])
+def test_decode_invalid_cursor(token):
+    with pytest.raises(ValueError):
+        decode_cursor(token, (parse_datetime, int))
+
+
+def test_parse_limit():
+    assert parse_limit(None, 100, 1000) == 100
+    assert parse_limit("25", 100, 1000) == 25
+    for value in ("0", "1001", "ten"):
+        with pytest.raises(ValueError):
+            parse_limit(value, 100, 1000)
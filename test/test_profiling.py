@@ -0,0 +1,138 @@
+import io
+import json
+import time
+from unittest.mock import patch
+
+from exampleco.utils.profiling import Histogram, LatencyMetrics, instrument, phase
+
+
+def assert_valid_emf(document):
+    """Checks a document against the CloudWatch Embedded Metric Format specification."""
+    metadata = document["_aws"]
+    assert isinstance(metadata["Timestamp"], int)
+    assert 1 <= len(metadata["CloudWatchMetrics"])
+    for directive in metadata["CloudWatchMetrics"]:
+        assert isinstance(directive["Namespace"], str) and directive["Namespace"]
+        for dimension_set in directive["Dimensions"]:
+            assert len(dimension_set) <= 30
+            assert all(isinstance(document[dimension], str) for dimension in dimension_set)
+        assert 1 <= len(directive["Metrics"]) <= 100
+        for metric in directive["Metrics"]:
+            assert set(metric) <= {"Name", "Unit", "StorageResolution"}
+            value = document[metric["Name"]]
+            if isinstance(value, list):
+                assert 1 <= len(value) <= 100
+                assert all(isinstance(item, (int, float)) and not isinstance(item, bool) for item in value)
+            else:
+                assert isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def test_histogram_percentiles():
+    histogram = Histogram()
+    assert histogram.percentile(0.5) is None
+    for value in range(1, 101):
+        histogram.record(value)
+    assert 50 <= histogram.percentile(0.5) <= 50 * 1.15
+    assert 95 <= histogram.percentile(0.95) <= 100
+    assert histogram.percentile(0.99) <= 100
+    assert (histogram.count, histogram.min, histogram.max, histogram.sum) == (100, 1, 100, 5050)
+
+
+def test_latency_metrics_flush():
+    now = [0.0]
+    metrics = LatencyMetrics(namespace="test", flush_interval=60, clock=lambda: now[0], now=lambda: 1800000000.25)
+    metrics.record("get_order", {"wall_ms": 12.0, "query_ms": 3.0})
+    metrics.record("get_order", {"wall_ms": 20.0})
+    assert metrics.snapshot()["get_order"]["wall_ms"]["count"] == 2
+
+    stream = io.StringIO()
+    metrics.flush(stream=stream)
+    assert stream.getvalue() == ""
+    now[0] = 61
+    metrics.flush(stream=stream)
+    [document] = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert_valid_emf(document)
+    [directive] = document["_aws"]["CloudWatchMetrics"]
+    assert directive["Namespace"] == "test"
+    assert directive["Dimensions"] == [["handler"]]
+    assert {metric["Name"] for metric in directive["Metrics"]} == {"wall_ms", "query_ms"}
+    assert document["handler"] == "get_order"
+    assert (document["wall_ms"], document["query_ms"]) == ([12.0, 20.0], [3.0])
+    assert document["_aws"]["Timestamp"] == 1800000000250
+    assert metrics.snapshot() == {}
+
+
+def test_latency_metrics_timestamps_of_recording():
+    now = [1800000000.0]
+    metrics = LatencyMetrics(namespace="test", flush_interval=1e9, now=lambda: now[0])
+    metrics.record("get_order", {"wall_ms": 12.0})
+    now[0] += 30
+    metrics.record("get_order", {"wall_ms": 14.0})
+    now[0] += 60
+    metrics.record("get_order", {"wall_ms": 16.0})
+    now[0] += 600
+    documents = metrics.emf()
+    assert [(document["_aws"]["Timestamp"], document["wall_ms"]) for document in documents] == [
+        (1800000000000, [12.0, 14.0]),
+        (1800000090000, [16.0]),
+    ]
+
+
+def test_latency_metrics_emf_batches():
+    metrics = LatencyMetrics(namespace="test")
+    for value in range(250):
+        metrics.record("get_all_orders", {"wall_ms": value + 0.5, **({"query_ms": 1.0} if value < 120 else {})})
+    documents = metrics.emf()
+    for document in documents:
+        assert_valid_emf(json.loads(json.dumps(document)))
+    assert [len(document["wall_ms"]) for document in documents] == [100, 100, 50]
+    assert [len(document.get("query_ms", [])) for document in documents] == [100, 20, 0]
+    assert [value for document in documents for value in document["wall_ms"]] == [value + 0.5 for value in range(250)]
+    assert metrics.emf() == []
+
+
+def test_instrument_records_phases():
+    @instrument
+    def handler(event, context):  # pylint: disable=unused-argument
+        with phase("query"):
+            time.sleep(0.01)
+        with phase("encode"):
+            return {"statusCode": 200}
+
+    metrics = LatencyMetrics(namespace="test", flush_interval=1e9)
+    with phase("parse"):
+        pass
+    with patch("exampleco.utils.profiling.latency_metrics", metrics):
+        assert handler({}, None) == {"statusCode": 200}
+    snapshot = metrics.snapshot()["handler"]
+    assert set(snapshot) == {"wall_ms", "cpu_ms", "query_ms", "encode_ms"}
+    assert snapshot["query_ms"]["p50"] >= 10
+    assert snapshot["cpu_ms"]["p50"] < snapshot["wall_ms"]["p50"]
+
+
+def test_instrument_flushes_every_invocation(capsys):
+    @instrument
+    def handler(event, context):  # pylint: disable=unused-argument
+        return {"statusCode": 200}
+
+    metrics = LatencyMetrics(namespace="test")
+    with patch("exampleco.utils.profiling.latency_metrics", metrics):
+        handler({}, None)
+    [document] = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert_valid_emf(document)
+    assert document["handler"] == "handler"
+    assert len(document["wall_ms"]) == len(document["cpu_ms"]) == 1
+    assert metrics.snapshot() == {}
+
+
+def test_instrument_dumps_slow_profiles(tmp_path):
+    @instrument
+    def handler(event, context):  # pylint: disable=unused-argument
+        return {"statusCode": 200}
+
+    with patch("exampleco.utils.profiling.PROFILE_SAMPLE_RATE", 1), patch(
+        "exampleco.utils.profiling.SLOW_INVOCATION_MS", 0
+    ), patch("exampleco.utils.profiling.PROFILE_DIR", str(tmp_path)):
+        handler({}, None)
+    [profile] = tmp_path.iterdir()
+    assert profile.name.startswith("handler-") and profile.suffix == ".prof"
@@ -0,0 +1,81 @@
+import datetime
+import json
+
+import pytest
+from exampleco.models.database.orders import Order, OrderItem
+from exampleco.models.database.schemas import OrderSchemaDetail, OrderSchemaList, ServiceSchema
+from exampleco.models.database.serializers import (
+    ORDER_ITEM_FIELDS,
+    ORDER_LIST_FIELDS,
+    cached_serializer,
+    dump_order,
+    dump_order_detail,
+    dump_service,
+    parse_fields,
+)
+from exampleco.models.database.services import Service
+
+CREATED_ON = datetime.datetime(2022, 9, 20, 19, 18, 9)
+MODIFIED_ON = datetime.datetime(2022, 9, 21, 8, 0, 0, 123456)
+
+
+def make_order(**kwargs):
+    order = Order(id=1, name="Test Order 1", service_id=2, total=66.66, created_on=CREATED_ON, modified_on=MODIFIED_ON)
+    order.order_items = [
+        OrderItem(
+            id=10 + i,
+            name=f"Test Item {i}",
+            order_id=1,
+            service_id=2,
+            price=22.22,
+            created_on=CREATED_ON,
+            modified_on=None,
+        )
+        for i in range(3)
+    ]
+    for name, value in kwargs.items():
+        setattr(order, name, value)
+    return order
+
+
+@pytest.mark.parametrize("order", [make_order(), make_order(modified_on=None, name="Ünïcode"), Order(id=5)])
+def test_dump_order_matches_schemas(order):
+    assert json.dumps(dump_order(order)) == json.dumps(OrderSchemaList().dump(order))
+    assert json.dumps(dump_order_detail(order)) == json.dumps(OrderSchemaDetail().dump(order))
+
+
+@pytest.mark.parametrize(
+    "service",
+    [
+        Service(id=1, name="Test Service 1", description=None, price=22, created_on=CREATED_ON),
+        Service(id=2, name="Test Service 2", description="Test Description 2", price=32.22, modified_on=MODIFIED_ON),
+    ],
+)
+def test_dump_service_matches_schema(service):
+    assert json.dumps(dump_service(service)) == json.dumps(ServiceSchema().dump(service))
+
+
+def test_parse_fields():
+    nested = {"order_items": ORDER_ITEM_FIELDS}
+    assert parse_fields(None, ORDER_LIST_FIELDS, nested) == (ORDER_LIST_FIELDS, nested)
+
+    fields, selected = parse_fields("name, id", ORDER_LIST_FIELDS, nested)
+    assert [name for name, _ in fields] == ["id", "name"]
+    assert selected == {}
+    assert cached_serializer(fields)(make_order()) == {"id": 1, "name": "Test Order 1"}
+
+    fields, selected = parse_fields("order_items.name,order_items.id", ORDER_LIST_FIELDS, nested)
+    assert fields == ()
+    assert [name for name, _ in selected["order_items"]] == ["id", "name"]
+    assert cached_serializer(fields)(make_order()) == {}
+
+    _, selected = parse_fields("order_items.name,order_items", ORDER_LIST_FIELDS, nested)
+    assert selected == nested
+
+
+@pytest.mark.parametrize("value", ["bogus", "id,", "id.name", "order_items.bogus"])
+def test_parse_fields_invalid(value):
+    with pytest.raises(ValueError):
+        parse_fields(value, ORDER_LIST_FIELDS, {"order_items": ORDER_ITEM_FIELDS})
+    with pytest.raises(ValueError):
+        parse_fields("order_items", ORDER_LIST_FIELDS)
@@ -1,7 +1,9 @@
+import datetime
 import json
 from unittest.mock import patch
 
 import pytest
+from exampleco.models.database.catalog import service_catalog
 from exampleco.models.database.services import Service
 
 from .conftest import db_config
@@ -21,6 +23,7 @@ def create_services(db_session):
         instances.append(instance)
         db_session.add(instance)
     db_session.commit()
+    service_catalog.clear()
     yield
     for instance in instances:
         db_session.delete(instance)
@@ -61,3 +64,57 @@ def test_get_service_does_not_exist(mock_get_db_config, create_services):  # pyl
     body = json.loads(response["body"])
 
     assert body["error"] == "Service with id BBBCCCDDD does not exist."
+
+
+@patch("exampleco.models.database.get_db_config", return_value=db_config)
+def test_get_services_revalidates(mock_get_db_config, create_services, db_session):  # pylint: disable=unused-argument
+    from exampleco.api.services import get_all_services
+
+    get_all_services({}, None)
+    service = db_session.query(Service).order_by(Service.id).first()
+    service.price = 99.99
+    service.modified_on = service.modified_on + datetime.timedelta(seconds=1)
+    db_session.commit()
+    body = json.loads(get_all_services({}, None)["body"])
+    assert body[0]["price"] == test_data_list[0]["price"]
+
+    service_catalog.checked_at = None
+    body = json.loads(get_all_services({}, None)["body"])
+    assert body[0]["price"] == 99.99
+
+
+@patch("exampleco.models.database.get_db_config", return_value=db_config)
+def test_get_services_conditional(mock_get_db_config, create_services, db_session):  # pylint: disable=unused-argument
+    from exampleco.api.services import get_all_services, get_service
+
+    response = get_all_services({}, None)
+    etag = response["headers"]["ETag"]
+    assert etag.startswith('W/"')
+    assert "Last-Modified" not in response["headers"]
+    response = get_all_services({"headers": {"if-none-match": etag}}, None)
+    assert response["statusCode"] == 304
+    assert "body" not in response
+    response = get_all_services({"headers": {"if-modified-since": "Fri, 01 Jan 2100 00:00:00 GMT"}}, None)
+    assert response["statusCode"] == 200
+
+    service = db_session.query(Service).first()
+    response = get_service({"pathParameters": {"pk": service.id}}, None)
+    headers = response["headers"]
+    assert headers["ETag"].startswith('W/"')
+    assert get_service({"pathParameters": {"pk": service.id}, "headers": {"if-none-match": headers["ETag"]}}, None) == {
+        "statusCode": 304,
+        "headers": headers,
+    }
+    response = get_service(
+        {"pathParameters": {"pk": service.id}, "headers": {"if-modified-since": headers["Last-Modified"]}}, None
+    )
+    assert response["statusCode"] == 304
+
+    service.modified_on = service.modified_on + datetime.timedelta(seconds=1)
+    db_session.commit()
+    service_catalog.clear()
+    response = get_all_services({"headers": {"if-none-match": etag}}, None)
+    assert response["statusCode"] == 200
+    assert response["headers"]["ETag"] != etag
+    response = get_service({"pathParameters": {"pk": service.id}, "headers": {"if-none-match": headers["ETag"]}}, None)
+    assert response["statusCode"] == 200